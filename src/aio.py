@@ -0,0 +1,268 @@
+"""
+Асинхронный API конвейера (для встраивания в asyncio-сервис).
+
+    pipe = Pipeline(cfg, audio_src=None)
+    apipe = AsyncPipeline(pipe)
+    async for frag in apipe.fragments(source):   # source: async-итератор блоков float32
+        ...                                      # frag.asr_text / frag.mt_text / frag.tts_audio
+    pipe.close()
+
+Блокирующие вызовы моделей идут в свои пулы потоков (ASR — до resources.asr_workers
+одновременно, MT и TTS — по одному); захват, эхо-гейт и VAD — в цикле событий.
+Готовые фрагменты ждут потребителя в очереди на scheduling.max_pending штук: пока
+потребитель не заберёт фрагмент, следующий не переводится. Дальше backpressure доходит
+до источника: очереди перед ASR и MT ждут места, и захват перестаёт читать блоки.
+Только явно живой источник (live=True, микрофон) не ждёт: там очереди вытесняют старое,
+а планировщик пропускает устаревшие фрагменты и склеивает накопившиеся.
+Воспроизведение — отдельный необязательный потребитель (play_fragments).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterable, AsyncIterator, Iterable
+
+from .resources import pin_current_thread
+from .utils import Fragment, Stopwatch
+
+if TYPE_CHECKING:
+    import numpy as np
+    from .pipeline import Pipeline
+
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+async def iterate_in_thread(iterable: Iterable, maxsize: int = 64,
+                            stop: threading.Event | None = None, stamp: bool = False) -> AsyncIterator:
+    """
+    Блокирующий итератор (MicStream.stream(), WavStream.stream()) -> async-итератор.
+
+    Итератор крутится в отдельном потоке; вперёд он уходит не больше чем на maxsize
+    элементов (дальше ждёт потребителя). Ошибка источника пробрасывается потребителю.
+    stamp=True — отдавать пары (элемент, perf_counter()), снятые в потоке источника сразу
+    по получении блока: в буфере блок может пролежать долго, а эхо-гейту и дедлайнам
+    нужен момент захвата.
+    """
+    loop = asyncio.get_running_loop()
+    items: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(maxsize)
+    done = threading.Event()
+
+    def send(item):
+        try:
+            loop.call_soon_threadsafe(items.put_nowait, item)
+        except RuntimeError:  # цикл событий уже закрыт
+            done.set()
+
+    def produce():
+        try:
+            for item in iterable:
+                if stamp:
+                    item = (item, time.perf_counter())
+                while not slots.acquire(timeout=0.2):
+                    if done.is_set():
+                        return
+                if done.is_set() or (stop is not None and stop.is_set()):
+                    return
+                send(item)
+        except BaseException as exc:
+            send(exc)
+        finally:
+            send(_END)
+
+    thread = threading.Thread(target=produce, daemon=True, name="audio_source")
+    thread.start()
+    try:
+        while True:
+            item = await items.get()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            slots.release()
+            yield item
+    finally:
+        done.set()
+
+
+class AsyncPipeline:
+    """
+    Асинхронный драйвер над Pipeline: сам Pipeline хранит модели, VAD, эхо-гейт,
+    планировщик, логи и запись, а здесь — только порядок стадий и пулы потоков.
+    """
+
+    def __init__(self, pipeline: Pipeline, synth: bool = True, max_pending: int | None = None,
+                 live: bool = False):
+        self.p = pipeline
+        self.synth = synth
+        self.max_pending = max(max_pending or pipeline.cfg.scheduling.max_pending, 1)
+        self.live = live  # источник не может ждать (микрофон): вытеснение и дедлайны вместо ожидания
+
+    async def fragments(self, source: AsyncIterable) -> AsyncIterator[Fragment]:
+        """
+        Перевести поток блоков source. Элемент — блок float32 или пара (блок, perf_counter()
+        конца его захвата), как у iterate_in_thread(stamp=True); без отметки моментом захвата
+        считается момент, когда блок дошёл до конвейера. Итератор завершается, когда источник
+        исчерпан и все сегменты обработаны; при выходе из цикла потребителя стадии отменяются.
+        """
+        p = self.p
+        p.live = self.live
+        await asyncio.get_running_loop().run_in_executor(None, p.wait_ready)
+        plan = p.thread_plan
+        n_asr = max(plan.asr_workers, 1)
+        pools = {
+            stage: ThreadPoolExecutor(max_workers=n, thread_name_prefix=stage,
+                                      initializer=pin_current_thread,
+                                      initargs=(plan.cpus.get(stage, []), stage))
+            for stage, n in (("asr", n_asr), ("mt", 1), ("tts", 1))
+        }
+        out: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        have_segments = asyncio.Event()
+        have_frags = asyncio.Event()
+        segments_room = asyncio.Event()
+        frags_room = asyncio.Event()
+        capture_done = False
+        asr_done = False
+        t0 = time.perf_counter()
+
+        async def call(stage, fn, *args):
+            # Сбой движка на одном фрагменте не роняет конвейер: фрагмент пропускается
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pools[stage], fn, *args)
+            except Exception as exc:
+                p.failures += 1
+                logger.warning("Стадия %s: %s — фрагмент пропущен", stage, exc)
+                return None
+
+        async def capture():
+            nonlocal capture_done
+            n_in = 0
+            try:
+                async for item in source:
+                    if p.stop.is_set():
+                        break
+                    block, t_block = item if isinstance(item, tuple) else (item, time.perf_counter())
+                    # Не живой источник ждёт места: сегменты не вытесняются, чтение
+                    # (а через iterate_in_thread — и сам источник) притормаживает
+                    while not p.live and p.q_segments.full():
+                        segments_room.clear()
+                        await segments_room.wait()
+                    n_in += len(block)
+                    if p.feed(block, n_in, t_block):
+                        have_segments.set()
+            finally:
+                capture_done = True
+                have_segments.set()
+
+        # Порядок речи внутри канала: сегменты нумеруются при выдаче из очереди, и результат
+        # распознавания ждёт, пока не выйдут все более ранние сегменты того же канала
+        issued: dict[int, int] = {}
+        released: dict[int, int] = {}
+        turns: dict[int, asyncio.Condition] = {}
+
+        async def recognize():
+            # Несколько таких задач делят FairQueue: ASR обслуживает каналы по кругу
+            # и идёт параллельно, но дальше фрагменты канала уходят по порядку
+            while True:
+                item = p.q_segments.get(timeout=0)
+                if item is None:
+                    if capture_done:
+                        return
+                    have_segments.clear()
+                    await have_segments.wait()
+                    continue
+                segments_room.set()
+                ch, (seg, n_end, t_capture, partial) = item
+                seq = issued.get(ch, 0)
+                issued[ch] = seq + 1
+                turn = turns.setdefault(ch, asyncio.Condition())
+                frag = await call("asr", p.recognize, ch, seg, n_end, t_capture, t0, partial)
+                async with turn:
+                    await turn.wait_for(lambda: released.get(ch, 0) == seq)
+                    try:
+                        await emit(frag)
+                    finally:
+                        released[ch] = seq + 1
+                        turn.notify_all()
+
+        async def emit(frag: Fragment | None):
+            if frag is None:
+                return
+            # Инкрементальный режим: перевод с уже озвученным префиксом — здесь же,
+            # в очередь планировщика идёт только новый устоявшийся кусок
+            if p.streams and not await call("mt", p.translate_incremental, frag):
+                return
+            while not p.live and p.q_asr2mt.full():
+                frags_room.clear()
+                await frags_room.wait()
+            p.q_asr2mt.put(frag)
+            have_frags.set()
+
+        async def recognize_all():
+            nonlocal asr_done
+            try:
+                await asyncio.gather(*(recognize() for _ in range(n_asr)))
+            finally:
+                asr_done = True
+                have_frags.set()
+
+        async def translate():
+            while True:
+                # get() сам пропускает устаревшие и склеивает накопившиеся фрагменты
+                frag = p.q_asr2mt.get(timeout=0)
+                if frag is None:
+                    if asr_done and p.q_asr2mt.empty():
+                        break
+                    have_frags.clear()
+                    await have_frags.wait()
+                    continue
+                frags_room.set()
+                if not await call("mt", p.translate, frag):
+                    continue
+                if self.synth and not await call("tts", p.synthesize, frag):
+                    continue
+                p.log_fragment(frag)
+                await out.put(frag)  # backpressure: ждём, пока потребитель заберёт предыдущие
+            await out.put(_END)
+
+        tasks = [asyncio.create_task(c) for c in (capture(), recognize_all(), translate())]
+        try:
+            while True:
+                frag = await out.get()
+                if frag is _END:
+                    break
+                yield frag
+            await asyncio.gather(*tasks)
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for pool in pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def play_fragments(fragments: AsyncIterable[Fragment], pipeline: Pipeline):
+    """
+    Потребитель-проигрыватель: озвучивает фрагменты по порядку через pipeline.player.
+    Фрагмент, устаревший, пока ждал своей очереди, пропускается (учитывается как expired).
+    """
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="playback") as pool:
+        async for frag in fragments:
+            if frag.tts_audio is None or pipeline.q_asr2mt.expire(frag):
+                continue
+            sw = Stopwatch()
+            await loop.run_in_executor(pool, pipeline.player.play, frag.tts_audio)
+            frag.timings["play_ms"] = sw.ms()
+            pipeline.logger.log_record(
+                "played",
+                fragment_id=frag.fragment_id,
+                play_ms=frag.timings["play_ms"],
+                lag_ms=int((time.perf_counter() - frag.t_capture) * 1000),
+            )
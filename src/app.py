@@ -5,32 +5,63 @@ _os.environ.setdefault("ORT_DISABLE_TENSORRT", "1")
 _os.environ.setdefault("ORT_DML_ENABLE", "0")
 
 import argparse
+import logging
 from .config import Cfg
-from .pipeline import Pipeline
-from .audio_in import MicStream, WavStream
+# Pipeline и источники звука импортируются внутри main(): разбор аргументов и конфига
+# не должен тянуть sounddevice/soundfile и модули движков.
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--config', required=True)
     ap.add_argument('--mode', choices=['mic','wav'])
     ap.add_argument('--input', help='wav path for wav mode')
+    ap.add_argument('--profile', action='store_true',
+                    help='профилирование стадий, аллокаций и памяти; отчёт в logging.dir при выходе')
+    ap.add_argument('--profile-interval-ms', type=int, default=10)
+    ap.add_argument('--profile-mem-s', type=float, default=5.0)
     args = ap.parse_args()
 
     cfg = Cfg.load(args.config)
+    # Без этого не видно отчётов logging: тайминги загрузки, план потоков, размещение, итоговые счётчики
+    logging.basicConfig(level=cfg.logging.level)
     if args.mode:
         cfg.app.mode = args.mode
     if args.input:
         cfg.app.input_wav = args.input
 
     if cfg.app.mode == 'mic':
-        audio_src = MicStream(samplerate=cfg.app.sample_rate, block_ms=cfg.app.chunk_ms)
+        from .audio_in import MicStream
+        from .pipeline import input_channels
+        audio_src = MicStream(samplerate=cfg.app.sample_rate, block_ms=cfg.app.chunk_ms,
+                              channels=input_channels(cfg))
     else:
         if not cfg.app.input_wav:
             raise SystemExit('Provide --input <file.wav> for wav mode')
-        audio_src = WavStream(path=cfg.app.input_wav, samplerate=cfg.app.sample_rate, block_ms=cfg.app.chunk_ms)
+        from .audio_in import WavStream
+        audio_src = WavStream(path=cfg.app.input_wav, samplerate=cfg.app.sample_rate, block_ms=cfg.app.chunk_ms,
+                              keep_channels=bool(cfg.app.channels))
 
+    # Профайлер стартует до конвейера, чтобы в отчёт попала и загрузка моделей
+    # (tracemalloc — после неё); без --profile модуль даже не импортируется
+    prof = None
+    if args.profile:
+        from .profiling import Profiler
+        prof = Profiler(cfg.logging.dir, interval_ms=args.profile_interval_ms,
+                        mem_interval_s=args.profile_mem_s)
+        prof.start()
+
+    from .pipeline import Pipeline
     pipe = Pipeline(cfg, audio_src)
-    pipe.run()
+    try:
+        if prof is not None:
+            pipe.wait_ready()
+            prof.start_tracing()
+        pipe.run()
+    finally:
+        if prof is not None:
+            prof.stop()
+            for path in prof.write(pipe.logger.session_prefix):
+                print(f"profile: {path}")
 
 if __name__ == '__main__':
     main()
@@ -3,12 +3,15 @@ from __future__ import annotations
 import logging
 import os
 
+import numpy as np
+
 
 logger = logging.getLogger(__name__)
 
 
 class ASR:
-    def __init__(self, engine: str, model_path: str, beam_size: int, lang_detect: bool, use_gpu: bool, mock: bool):
+    def __init__(self, engine: str, model_path: str, beam_size: int, lang_detect: bool, use_gpu: bool, mock: bool,
+                 cpu_threads: int = 0, num_workers: int = 1, compute_type: str | None = None):
         self.engine = engine
         self.model_path = model_path
         self.beam_size = beam_size
@@ -26,14 +29,18 @@ class ASR:
 
                 from faster_whisper import WhisperModel
 
+                # 0 = по умолчанию ctranslate2 (все ядра); планировщик ресурсов задаёт явную долю
+                threads_kw = {"cpu_threads": cpu_threads, "num_workers": num_workers}
                 device = "cuda" if use_gpu else "cpu"
-                compute_type = "float16" if use_gpu else "int8"
+                # Тип вычислений задаёт планировщик размещения; без него — прежние умолчания
+                compute_type = compute_type or ("float16" if use_gpu else "int8")
 
                 try:
                     self.model = WhisperModel(
                         model_path,
                         device=device,
                         compute_type=compute_type,
+                        **threads_kw,
                     )
                 except (RuntimeError, ValueError) as err:
                     if use_gpu and "float16" in compute_type:
@@ -42,6 +49,7 @@ class ASR:
                             model_path,
                             device=device,
                             compute_type="float32",
+                            **threads_kw,
                         )
                     elif "cudnn" in str(err).lower() or "cuda" in str(err).lower():
                         logger.warning(
@@ -56,6 +64,7 @@ class ASR:
                             model_path,
                             device=device,
                             compute_type=compute_type,
+                            **threads_kw,
                         )
                     else:
                         raise err
@@ -65,11 +74,20 @@ class ASR:
             else:
                 raise ValueError(f"Unknown ASR engine: {engine}")
 
-    def transcribe_segment(self, audio_f32_mono, sr: int) -> tuple[str, str]:
+    def warmup(self, sr: int = 16000):
+        """Короткий синтетический прогон: первая реальная фраза не платит за инициализацию ядер."""
+        if self.mock or self.model is None:
+            return
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(sr) * 0.01).astype("float32")
+        self.transcribe_segment(audio, sr)
+
+    def transcribe_segment(self, audio_f32_mono, sr: int, language: str | None = None) -> tuple[str, str]:
+        """language — зафиксировать язык (канал с известным диктором); None — автоопределение."""
         if self.mock:
-            return ("ru", "это тестовая фраза")
+            return (language or "ru", "это тестовая фраза")
         if self.engine == "faster-whisper":
-            segments, info = self.model.transcribe(audio=audio_f32_mono, beam_size=self.beam_size, language=None if self.lang_detect else None)
+            segments, info = self.model.transcribe(audio=audio_f32_mono, beam_size=self.beam_size, language=language)
             text = " ".join(s.text.strip() for s in segments)
             lang = info.language or "auto"
             return (lang, text.strip())
@@ -1,33 +1,51 @@
 from __future__ import annotations
-import sounddevice as sd
 import numpy as np
-import soundfile as sf
 from typing import Iterable
 
 class MicStream:
-    def __init__(self, samplerate: int = 16000, block_ms: int = 500, device: str | None = None):
+    """channels=1 — моно-блоки (frames,); channels>1 — блоки (frames, channels)."""
+    def __init__(self, samplerate: int = 16000, block_ms: int = 500, device: str | None = None,
+                 channels: int = 1):
         self.sr = samplerate
         self.block = int(self.sr * block_ms / 1000)
         self.device = device
+        self.channels = channels
+
+    def available_channels(self) -> int:
+        """Сколько входных каналов у устройства."""
+        import sounddevice as sd  # лениво: нужен только в режиме mic
+        return int(sd.query_devices(self.device, "input")["max_input_channels"])
 
     def stream(self) -> Iterable[np.ndarray]:
-        with sd.InputStream(samplerate=self.sr, channels=1, dtype='float32', device=self.device,
+        import sounddevice as sd  # лениво: нужен только в режиме mic
+        with sd.InputStream(samplerate=self.sr, channels=self.channels, dtype='float32', device=self.device,
                             blocksize=self.block) as st:
             while True:
                 data, _ = st.read(self.block)
-                yield data.reshape(-1)
+                yield data.reshape(-1) if self.channels == 1 else data
 
 class WavStream:
-    def __init__(self, path: str, samplerate: int = 16000, block_ms: int = 500):
+    """keep_channels=True — блоки (frames, channels) без сведения в моно."""
+    def __init__(self, path: str, samplerate: int = 16000, block_ms: int = 500,
+                 keep_channels: bool = False):
         self.path = path
         self.sr = samplerate
         self.block = int(self.sr * block_ms / 1000)
+        self.keep_channels = keep_channels
+
+    def available_channels(self) -> int:
+        """Сколько каналов будет в блоках (без keep_channels файл сводится в моно)."""
+        if not self.keep_channels:
+            return 1
+        import soundfile as sf  # лениво: нужен только в режиме wav
+        return sf.info(self.path).channels
 
     def stream(self) -> Iterable[np.ndarray]:
-        data, sr = sf.read(self.path, dtype='float32', always_2d=False)
+        import soundfile as sf  # лениво: нужен только в режиме wav
+        data, sr = sf.read(self.path, dtype='float32', always_2d=self.keep_channels)
         if sr != self.sr:
             raise RuntimeError(f"Expected {self.sr} Hz, got {sr}. Resample externally for now.")
-        if data.ndim == 2:
+        if data.ndim == 2 and not self.keep_channels:
             data = data.mean(axis=1)
         for i in range(0, len(data), self.block):
             yield data[i:i+self.block]
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class BatchWorker:
+    """
+    Общий рабочий поток модели: собирает запросы от всех сессий в пачки.
+
+    submit() кладёт запрос и сразу возвращает Future. Поток берёт первый запрос,
+    добирает ещё до max_batch штук, ожидая не дольше max_wait_ms, и вызывает
+    fn_batch(list_of_args) -> list_of_results одним вызовом. Исключение на месте
+    результата уходит только в Future своего запроса; ошибка всей пачки — во все её Future.
+    После close() недообработанные и новые запросы завершаются ошибкой, а не висят.
+    """
+
+    def __init__(self, fn_batch, max_batch: int = 8, max_wait_ms: int = 10, name: str = "batch"):
+        self.fn_batch = fn_batch
+        self.max_batch = max(max_batch, 1)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self._q: queue.Queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, daemon=True, name=name)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        fut: Future = Future()
+        with self._lock:
+            if not self._closed:
+                self._q.put((item, fut))
+                return fut
+        fut.set_exception(RuntimeError(f"{self.name}: обработчик закрыт"))
+        return fut
+
+    def close(self, timeout: float = 2.0):
+        with self._lock:
+            self._closed = True
+            self._q.put(_STOP)
+        self._thread.join(timeout=timeout)
+        # что поток не успел взять (или пришло после _STOP) — завершаем ошибкой
+        while True:
+            try:
+                entry = self._q.get_nowait()
+            except queue.Empty:
+                break
+            if entry is not _STOP and entry[1].set_running_or_notify_cancel():
+                entry[1].set_exception(RuntimeError(f"{self.name}: обработчик закрыт"))
+
+    def avg_batch(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            first = self._q.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._q.get(timeout=max(deadline - time.monotonic(), 0.0))
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stopping = True
+                    break
+                batch.append(nxt)
+
+            batch = [(item, fut) for item, fut in batch if fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.fn_batch([item for item, _ in batch])
+            except BaseException as exc:
+                logger.warning("%s: ошибка обработки пачки из %d: %s", self.name, len(batch), exc)
+                for _, fut in batch:
+                    fut.set_exception(exc)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, fut), res in zip(batch, results):
+                if isinstance(res, BaseException):
+                    fut.set_exception(res)
+                else:
+                    fut.set_result(res)
@@ -3,6 +3,13 @@ from pydantic import BaseModel
 from typing import Literal
 import yaml
 
+Device = Literal["auto", "cpu", "cuda"]
+
+class ChannelCfg(BaseModel):
+    index: int                               # номер канала входа (0 — левый)
+    dir: Literal["ru-en", "en-ru"]           # фиксированное направление для диктора этого канала
+    name: str = ""
+
 class AppCfg(BaseModel):
     mode: Literal["mic", "wav"] = "mic"
     input_wav: str = ""
@@ -11,10 +18,33 @@ class AppCfg(BaseModel):
     chunk_ms: int = 500
     src_lang: Literal["ru", "en", "auto"] = "auto"
     dir: Literal["ru-en", "en-ru", "auto"] = "auto"
+    # Многоканальный вход: по диктору на канал, свой VAD и направление; пусто — моно
+    channels: list[ChannelCfg] = []
 
 class ResourcesCfg(BaseModel):
     use_gpu: Literal["auto", True, False] = "auto"
-    threads: int = 4
+    threads: int = 4             # общий бюджет потоков CPU на ASR + MT + TTS
+    threads_split: dict[str, int] | None = None  # явная раскладка {asr: 3, mt: 2, tts: 1}
+    asr_workers: int = 1         # num_workers у WhisperModel
+    pin_threads: bool = False    # привязать потоки стадий к непересекающимся ядрам
+    # Бюджеты памяти для автоматического размещения (МБ; None — по факту свободной памяти)
+    vram_budget_mb: int | None = None
+    ram_budget_mb: int | None = None
+    parallel_load: bool = True   # грузить ASR/MT/TTS одновременно на пуле потоков
+    warmup: bool = True          # короткий синтетический прогон ASR и MT сразу после загрузки
+
+class SchedulingCfg(BaseModel):
+    queue_size: int = 32         # очередь ASR -> MT/TTS; при переполнении (микрофон) вытесняются старые
+    segment_queue: int = 8       # сегментов на канал ждут ASR; микрофон вытесняет старые, файл ждёт места
+    max_lag_ms: int = 6000       # (микрофон) фрагмент старше (от конца захвата) не переводим/не озвучиваем; 0 — без дедлайна
+    merge_max_words: int = 40    # склеивать накопившиеся фрагменты одного направления до N слов; 0 — не склеивать
+    max_pending: int = 2         # готовых фрагментов ждут потребителя (воспроизведение / async-итератор)
+
+class StreamingCfg(BaseModel):
+    enabled: bool = False        # инкрементальный перевод: переводить растущий префикс, не дожидаясь конца фразы
+    interval_ms: int = 1000      # как часто перепереводить незавершённый сегмент
+    wait_k: int = 2              # последние k слов гипотезы не отдаём (могут измениться с новым звуком)
+    min_commit_words: int = 2    # кусок короче не отдаём в TTS (кроме хвоста в конце фразы)
 
 class VadCfg(BaseModel):
     enabled: bool = True
@@ -27,6 +57,8 @@ class AsrCfg(BaseModel):
     model_path: str = "models/whisper-medium-ct2"
     beam_size: int = 5
     lang_detect: bool = True
+    device: Device = "auto"
+    compute_type: str = "auto"   # auto | float16 | int8_float16 | int8 | float32 ...
 
 class SegmenterCfg(BaseModel):
     strategy: Literal["punct_pause", "fixed"] = "punct_pause"
@@ -37,6 +69,8 @@ class MtCfg(BaseModel):
     model_path: str = "models/nllb-ru-en-ct2"       # для RU→EN
     model_path_back: str | None = None              # для EN→RU (Marian/NLLB)
     max_src_tokens: int = 64
+    device: Device = "auto"
+    compute_type: str = "auto"   # auto | float32 | float16 (cuda) | int8 (cpu, динамическая квантизация Marian)
     segmenter: SegmenterCfg = SegmenterCfg()
 
 class TtsVoicesCfg(BaseModel):
@@ -56,6 +90,7 @@ class TtsCfg(BaseModel):
     engine: Literal["silero", "piper"] = "silero"   # <-- добавили "piper"
     voices: TtsVoicesCfg = TtsVoicesCfg()
     playback: TtsPlaybackCfg = TtsPlaybackCfg()
+    device: Device = "cpu"       # cuda -> Piper с --cuda (нужен onnxruntime-gpu); auto — по VRAM
     # Параметры Piper (опционально в конфиге tts.piper: {...})
     piper: PiperCfg | None = None
 
@@ -64,20 +99,55 @@ class LoggingCfg(BaseModel):
     level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = "INFO"
     dir: str = "logs"
     save_tts_wav: bool = False
+    save_input_wav: bool = False     # запись входного потока (для повторного прогона)
+    record_queue_blocks: int = 256   # буфер фонового рекордера; при переполнении блоки теряются
+    # Фоновая запись логов: сброс на диск раз в flush_interval_ms или по flush_max_lines строк
+    flush_interval_ms: int = 200
+    flush_max_lines: int = 64
+    jsonl: bool = False              # структурированные записи {session}_events.jsonl
 
 class SafetyCfg(BaseModel):
     prevent_feedback_loop: Literal["mute_mic", "ducking", "none"] = "ducking"
     ducking_db: int = -12
+    tail_ms: int = 300   # сколько ещё держать гейт после конца воспроизведения (реверберация)
+
+class ServerCfg(BaseModel):
+    host: str = "127.0.0.1"
+    port: int = 8765
+    asr_batch: int = 4          # сегментов ASR за один проход общего воркера
+    mt_batch: int = 16          # фраз MT в одном generate
+    batch_wait_ms: int = 20     # сколько ждать добора пачки
+    session_queue: int = 16     # сегментов в очереди сессии (переполнение вытесняет старые)
+
+class MockLatencyCfg(BaseModel):
+    dist: Literal["fixed", "normal", "longtail"] = "fixed"
+    ms: float = 0.0              # fixed: задержка; normal: среднее; longtail: медиана
+    jitter_ms: float = 0.0       # normal: стандартное отклонение
+    sigma: float = 1.0           # longtail: sigma логнормального (больше — длиннее хвост)
+    per_unit_ms: float = 0.0     # + на единицу работы: секунду аудио (ASR) / слово (MT, TTS)
+    fail_rate: float = 0.0       # доля вызовов, падающих с MockFailure
+
+class MockCfg(BaseModel):
+    # Действует только при app.mock: true; по умолчанию mock-движки отвечают мгновенно
+    seed: int | None = None
+    asr: MockLatencyCfg = MockLatencyCfg()
+    mt: MockLatencyCfg = MockLatencyCfg()
+    tts: MockLatencyCfg = MockLatencyCfg()
+    playback: Literal["device", "sleep"] = "device"  # sleep: без звуковой карты, ждать длительность звука
 
 class Cfg(BaseModel):
     app: AppCfg = AppCfg()
     resources: ResourcesCfg = ResourcesCfg()
+    scheduling: SchedulingCfg = SchedulingCfg()
+    streaming: StreamingCfg = StreamingCfg()
     vad: VadCfg = VadCfg()
     asr: AsrCfg = AsrCfg()
     mt: MtCfg = MtCfg()
     tts: TtsCfg = TtsCfg()
     logging: LoggingCfg = LoggingCfg()
     safety: SafetyCfg = SafetyCfg()
+    server: ServerCfg = ServerCfg()
+    mock: MockCfg = MockCfg()
 
     @staticmethod
     def load(path: str) -> "Cfg":
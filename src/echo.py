@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .playback import PlaybackMonitor
+from .vad import SimpleEnergyVAD
+
+
+class EchoGate:
+    """
+    Подавление обратной связи динамик -> микрофон (safety.prevent_feedback_loop).
+
+    Блок микрофона, совпавший по времени с воспроизведением (плюс хвост tail_ms),
+    до VAD:
+      - mute_mic — заменяется тишиной;
+      - ducking  — ослабляется на ducking_db (только пока огибающая выхода выше env_floor).
+
+    Для статистики параллельно работает «теневой» VAD на исходном звуке: если он выдал
+    сегмент, пересекавшийся с гейтингом, а основной VAD — нет, это один сэкономленный
+    вызов ASR (asr_avoided).
+    """
+
+    def __init__(self, mode: str, ducking_db: float, monitor: PlaybackMonitor, vad: SimpleEnergyVAD,
+                 sr: int = 16000, tail_ms: int = 300, env_floor: float = 1e-3):
+        self.mode = mode
+        self.gain = float(10 ** (ducking_db / 20.0))
+        self.monitor = monitor
+        self.sr = sr
+        self.tail_s = tail_ms / 1000.0
+        self.env_floor = env_floor
+        self.shadow_vad = vad
+
+        self.gated_blocks = 0
+        self.asr_avoided = 0
+        self._gated_in_seg = False
+        self._shadow_emitted = False
+
+    def process(self, block: np.ndarray, t_end: float) -> np.ndarray:
+        """Блок, закончившийся в момент t_end (perf_counter), — вернуть то, что пойдёт в VAD."""
+        t_start = t_end - len(block) / self.sr
+        out = block
+        if self.monitor.active(t_start, t_end, self.tail_s):
+            if self.mode == "mute_mic":
+                out = np.zeros_like(block)
+            elif self.mode == "ducking" and self.monitor.envelope(t_start, t_end, self.tail_s) > self.env_floor:
+                out = block * self.gain
+        if out is not block:
+            self.gated_blocks += 1
+            self._gated_in_seg = True
+
+        self._shadow_emitted = self.shadow_vad.push(block) is not None
+        return out
+
+    def note_vad(self, emitted: bool):
+        """Сообщить, выдал ли основной VAD сегмент на этом блоке."""
+        if not self._shadow_emitted:
+            if not self.shadow_vad.in_speech and not self.shadow_vad.speech_buf:
+                self._gated_in_seg = False
+            return
+        if self._gated_in_seg and not emitted:
+            self.asr_avoided += 1
+        self._gated_in_seg = False
+
+    def stats(self) -> dict[str, int]:
+        return {"echo_gated_blocks": self.gated_blocks, "asr_avoided": self.asr_avoided}
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import threading
+
+
+def lcp_len(a: list[str], b: list[str]) -> int:
+    """Длина общего префикса двух списков слов."""
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def _norm(word: str) -> str:
+    return "".join(c for c in word.lower() if c.isalnum())
+
+
+def align_prefix(words: list[str], committed: list[str]) -> int | None:
+    """
+    Сколько слов гипотезы покрывают закоммиченный префикс; None — гипотеза с ним разошлась.
+
+    MT заново детокенизирует принудительный префикс, и слова могут не совпасть буквально
+    ("don't" / "do n't", "hello ," / "hello,"), поэтому сравниваются буквы и цифры
+    без регистра; идущие следом токены из одной пунктуации тоже считаются покрытыми.
+    """
+    if not committed:
+        return 0
+    target = "".join(_norm(w) for w in committed)
+    got, n = "", 0
+    while len(got) < len(target) and n < len(words):
+        got += _norm(words[n])
+        n += 1
+    if got != target:
+        return None
+    while n < len(words) and not _norm(words[n]):
+        n += 1
+    return n
+
+
+def cut_chunk(words: list[str], chunk: str) -> list[str] | None:
+    """Убрать последнее вхождение куска chunk из списка слов (None — не нашёлся)."""
+    part = chunk.split()
+    for i in range(len(words) - len(part), -1, -1):
+        if part and words[i:i + len(part)] == part:
+            return words[:i] + words[i + len(part):]
+    return None
+
+
+class CommitPolicy:
+    """
+    Что из очередной гипотезы перевода уже можно озвучивать.
+
+    Слово коммитится, когда оно совпало в двух гипотезах подряд (общий префикс) и
+    за ним в текущей гипотезе ещё есть wait_k слов: хвост перевода меняется с каждым
+    новым словом источника, начало — почти никогда. Закоммиченное не отзывается:
+    следующие гипотезы декодируются с ним как с принудительным префиксом. Если гипотеза
+    всё же с ним разошлась, состояние сбрасывается и перевод сегмента начинается заново.
+    Кусок, который так и не прозвучал (истёк дедлайн), убирается через retract().
+    """
+
+    def __init__(self, wait_k: int = 2, min_words: int = 1):
+        self.wait_k = max(wait_k, 0)
+        self.min_words = max(min_words, 1)
+        self.committed: list[str] = []
+        self.final_text = ""
+        self._prev: list[str] = []
+
+    @property
+    def prefix(self) -> str:
+        return " ".join(self.committed)
+
+    def update(self, hyp: str) -> str:
+        """Гипотеза для незавершённого сегмента -> новый устоявшийся кусок ("" — пока нечего)."""
+        words = hyp.split()
+        prev, self._prev = self._prev, words
+        # устойчивость хвоста — после закоммиченного префикса, как бы его ни детокенизировали
+        n, m = align_prefix(words, self.committed), align_prefix(prev, self.committed)
+        stable = 0 if n is None or m is None else n + lcp_len(prev[m:], words[n:])
+        return self._commit(words, min(stable, len(words) - self.wait_k), self.min_words)
+
+    def finish(self, hyp: str) -> str:
+        """
+        Финальная гипотеза (сегмент закрыт VAD) -> весь незакоммиченный хвост.
+        Состояние сбрасывается; весь озвученный перевод сегмента остаётся в final_text.
+        """
+        words = hyp.split()
+        chunk = self._commit(words, len(words), 1)
+        self.final_text = self.prefix
+        self.reset()
+        return chunk
+
+    def reset(self):
+        self.committed = []
+        self._prev = []
+
+    def retract(self, chunk: str) -> bool:
+        """Кусок не озвучен: убрать его из закоммиченного префикса (False — его там нет)."""
+        rest = cut_chunk(self.committed, chunk)
+        if rest is None:
+            return False
+        self.committed = rest
+        # стабильность считаем заново от оставшегося префикса
+        self._prev = list(rest)
+        return True
+
+    def _commit(self, words: list[str], upto: int, min_words: int) -> str:
+        n = align_prefix(words, self.committed)
+        if n is None:
+            self.reset()
+            return ""
+        if upto - n < min_words:
+            return ""
+        new = words[n:upto]
+        self.committed += new
+        return " ".join(new)
+
+
+class IncrementalTranslator:
+    """
+    Инкрементальный перевод одного канала: растущий ASR-префикс переводится
+    с уже озвученной частью как принудительным началом (MT.translate_prefix),
+    так что заново декодируется только хвост.
+
+    Шаги могут прийти не по порядку (ASR в нескольких потоках): шаг, который
+    не длиннее уже учтённого (n_end), пропускается — в том числе запоздавшие
+    префиксы уже закрытого сегмента.
+
+    epoch — номер текущей гипотезы (растёт при закрытии сегмента и при сбросе),
+    last_epoch — номер гипотезы, к которой относится кусок последнего step():
+    по нему retract() понимает, из чего убирать неозвученный кусок.
+    """
+
+    def __init__(self, wait_k: int = 2, min_words: int = 1):
+        self.policy = CommitPolicy(wait_k, min_words)
+        self.direction: str | None = None
+        self.last_end = 0
+        self.epoch = 0
+        self.last_epoch = 0
+        self._final_epoch: int | None = None
+        self._lock = threading.Lock()
+
+    def step(self, mt, text: str, direction: str, n_end: int, final: bool) -> str | None:
+        """Новый кусок перевода для озвучивания ("" — пока нечего; None — шаг устарел)."""
+        with self._lock:
+            if n_end <= self.last_end:
+                return None
+            self.last_end = n_end
+            if direction != self.direction:
+                # язык префикса определился иначе — начинаем перевод заново
+                self.policy.reset()
+                self.direction = direction
+                self.epoch += 1
+            hyp = mt.translate_prefix(text, direction, self.policy.prefix)
+            self.last_epoch = self.epoch
+            if final:
+                self.direction = None
+                self._final_epoch = self.epoch
+                self.epoch += 1
+                return self.policy.finish(hyp)
+            return self.policy.update(hyp)
+
+    def end(self, n_end: int):
+        """Сегмент закрыт без перевода (мусор/устарел): забыть незавершённую гипотезу."""
+        with self._lock:
+            self.last_end = max(self.last_end, n_end)
+            self.direction = None
+            self.policy.reset()
+            self.epoch += 1
+
+    def retract(self, chunk: str, epoch: int):
+        """
+        Кусок гипотезы epoch не прозвучал (истёк или вытеснен из очереди): убрать его
+        из озвученного префикса, а у закрытого сегмента — из итогового final_text.
+        """
+        with self._lock:
+            if epoch == self.epoch:
+                self.policy.retract(chunk)
+            elif epoch == self._final_epoch:
+                rest = cut_chunk(self.policy.final_text.split(), chunk)
+                if rest is not None:
+                    self.policy.final_text = " ".join(rest)
@@ -1,33 +1,61 @@
 from __future__ import annotations
 import os
 import io
+import json
+import logging
+import queue
 import threading
+import time
 from datetime import datetime
 
 def _ts() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]  # до миллисекунд
 
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
 class LogWriter:
     """
-    Потокобезопасная запись логов ASR, MT и сводного "dialog".
+    Асинхронная запись логов ASR, MT и сводного "dialog".
     На каждый запуск создаёт новый сет файлов с меткой времени.
+
+    Горячие потоки только кладут строки в очередь (без ожидания диска),
+    фоновый поток держит файлы открытыми и пишет пачками: по истечении
+    flush_interval_ms или при накоплении flush_max_lines строк.
+    При jsonl=True рядом пишется {session}_events.jsonl со структурированными записями.
     """
-    def __init__(self, log_dir: str, session_prefix: str | None = None):
+    def __init__(self, log_dir: str, session_prefix: str | None = None,
+                 flush_interval_ms: int = 200, flush_max_lines: int = 64,
+                 jsonl: bool = False, max_queue: int = 10000):
         self.log_dir = log_dir or "logs"
         os.makedirs(self.log_dir, exist_ok=True)
 
         if session_prefix is None:
             session_prefix = datetime.now().strftime("session_%Y%m%d_%H%M%S")
-
-        self._lock = threading.Lock()
+        self.session_prefix = session_prefix
 
         self.asr_path    = os.path.join(self.log_dir, f"{session_prefix}_asr.txt")
         self.mt_path     = os.path.join(self.log_dir, f"{session_prefix}_mt.txt")
         self.dialog_path = os.path.join(self.log_dir, f"{session_prefix}_dialog.txt")
+        self.jsonl_path  = os.path.join(self.log_dir, f"{session_prefix}_events.jsonl") if jsonl else None
+        self.piper_path  = os.path.join(self.log_dir, "piper_stderr.txt")
+
+        self.flush_interval = max(flush_interval_ms, 1) / 1000.0
+        self.flush_max_lines = max(flush_max_lines, 1)
+        self.dropped = 0  # сколько строк потеряно: переполнение очереди или ошибка записи
+
+        self._q: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._files: dict[str, io.TextIOWrapper] = {}
+        self._lock = threading.Lock()  # dropped меняют и горячие потоки, и поток записи
 
         # «ленивая» инициализация файлов — создадим пустые сразу (удобно глазами)
-        for p in (self.asr_path, self.mt_path, self.dialog_path):
-            open(p, "a", encoding="utf-8").close()
+        for p in (self.asr_path, self.mt_path, self.dialog_path, self.jsonl_path):
+            if p:
+                self._file(p)
+
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True, name="log_writer")
+        self._thread.start()
 
     def log_asr(self, fragment_id: str, t_start: float, t_end: float,
                 src_lang: str, text: str):
@@ -51,10 +79,103 @@ class LogWriter:
         )
         self._append(self.dialog_path, block)
 
+    def log_tts_input(self, lang: str, text: str):
+        """Текст, ушедший в синтез: {log_dir}/tts_input_{ru|en}.txt."""
+        self._append(os.path.join(self.log_dir, f"tts_input_{lang}.txt"), text + "\n")
+
+    def log_piper(self, text: str):
+        """Диагностика Piper (stderr, предупреждения) — {log_dir}/piper_stderr.txt."""
+        self._append(self.piper_path, text + "\n")
+
+    def log_record(self, kind: str, **fields):
+        """
+        Структурированная запись в JSONL (если включено).
+        Пример: log_record("fragment", fragment_id=..., asr_ms=..., mt_text=...).
+        """
+        if self.jsonl_path is None:
+            return
+        rec = {"ts": time.time(), "kind": kind, **fields}
+        self._append(self.jsonl_path, json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+
+    def close(self, timeout: float = 2.0):
+        """Дописать всё накопленное и закрыть файлы."""
+        if not self._thread.is_alive():
+            return
+        try:
+            self._q.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        if self.dropped:
+            logger.warning("Логи: потеряно строк: %d (переполнение очереди или ошибка записи)",
+                           self.dropped)
+
     # --- внутреннее ---
 
     def _append(self, path: str, text: str):
+        # Горячий путь: никогда не ждём диск — при переполнении просто считаем потерю
+        try:
+            self._q.put_nowait((path, text))
+        except queue.Full:
+            self._count_dropped(1)
+
+    def _count_dropped(self, n: int):
         with self._lock:
-            with io.open(path, "a", encoding="utf-8") as f:
-                f.write(text)
+            self.dropped += n
+
+    def _file(self, path: str) -> io.TextIOWrapper:
+        f = self._files.get(path)
+        if f is None:
+            f = io.open(path, "a", encoding="utf-8")
+            self._files[path] = f
+        return f
+
+    def _writer_loop(self):
+        batch: dict[str, list[str]] = {}
+        pending = 0
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            timeout = max(deadline - time.monotonic(), 0.0)
+            try:
+                item = self._q.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif item is not None:
+                path, text = item
+                batch.setdefault(path, []).append(text)
+                pending += 1
+
+            if stopping or pending >= self.flush_max_lines or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = {}
+                pending = 0
+                deadline = time.monotonic() + self.flush_interval
+
+        for f in self._files.values():
+            try:
+                f.close()
+            except Exception:
+                pass
+        self._files.clear()
+
+    def _flush(self, batch: dict[str, list[str]]):
+        for path, lines in batch.items():
+            try:
+                f = self._file(path)
+                f.write("".join(lines))
                 f.flush()
+            except Exception:
+                # логирование не должно ронять конвейер: закрываем файл (следующая пачка
+                # откроет его заново), а строки пачки считаем потерянными
+                self._count_dropped(len(lines))
+                f = self._files.pop(path, None)
+                if f is not None:
+                    try:
+                        f.close()
+                    except Exception:
+                        pass
@@ -0,0 +1,164 @@
+"""
+Mock-движки с реалистичным временем ответа (app.mock: true + секция mock: в конфиге).
+
+Обычные mock-ветки ASR/MT/TTS отвечают мгновенно — очереди, дедлайны, backpressure
+и остановка конвейера под нагрузкой так не проверяются. Здесь обёртки задерживают
+ответ по заданному распределению (fixed / normal / longtail) и, по желанию, падают
+с заданной вероятностью. Плюс синтетический вход «речь/тишина» с ускорением
+и «плеер», который только ждёт длительность звука.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import random
+import threading
+import time
+from typing import Iterable
+
+import numpy as np
+
+from .playback import Player
+
+
+logger = logging.getLogger(__name__)
+
+
+class MockFailure(RuntimeError):
+    """Сбой, подброшенный mock-движком (mock.*.fail_rate)."""
+
+
+class Latency:
+    """
+    Время ответа одного mock-движка: base (по распределению) + per_unit_ms на единицу
+    работы (секунда аудио у ASR, слово у MT/TTS). Генератор общий на потоки — под замком.
+    """
+
+    def __init__(self, cfg, seed: int | None = None, name: str = "mock"):
+        self.cfg = cfg
+        self.name = name
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, units: float = 0.0) -> float:
+        """Задержка в секундах."""
+        c = self.cfg
+        with self._lock:
+            if c.dist == "normal":
+                base = self._rng.gauss(c.ms, c.jitter_ms)
+            elif c.dist == "longtail":
+                # логнормальное с медианой ms: редкие ответы в разы дольше обычного
+                base = c.ms * math.exp(self._rng.gauss(0.0, c.sigma)) if c.ms > 0 else 0.0
+            else:
+                base = c.ms
+        return max(base + c.per_unit_ms * units, 0.0) / 1000.0
+
+    def wait(self, units: float = 0.0):
+        """Выждать задержку; с вероятностью fail_rate — упасть (после задержки, как настоящий таймаут)."""
+        with self._lock:
+            self.calls += 1
+            fail = self.cfg.fail_rate > 0 and self._rng.random() < self.cfg.fail_rate
+        delay = self.sample(units)
+        if delay > 0:
+            time.sleep(delay)
+        if fail:
+            with self._lock:
+                self.failures += 1
+            raise MockFailure(f"{self.name}: подброшенный сбой (fail_rate={self.cfg.fail_rate})")
+
+
+class _Delayed:
+    """Обёртка над mock-движком: всё, кроме переопределённых методов, — как у оригинала."""
+
+    def __init__(self, inner, latency: Latency):
+        self._inner = inner
+        self.latency = latency
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class MockASR(_Delayed):
+    def transcribe_segment(self, audio_f32_mono, sr: int, language: str | None = None) -> tuple[str, str]:
+        self.latency.wait(len(audio_f32_mono) / sr)
+        return self._inner.transcribe_segment(audio_f32_mono, sr, language=language)
+
+
+class MockMT(_Delayed):
+    def translate(self, text: str, direction: str) -> str:
+        return self.translate_batch([text], direction)[0]
+
+    def translate_batch(self, texts: list[str], direction: str) -> list[str]:
+        self.latency.wait(sum(len(t.split()) for t in texts))
+        return self._inner.translate_batch(texts, direction)
+
+    def translate_prefix(self, text: str, direction: str, prefix: str = "") -> str:
+        return self.translate(text, direction)
+
+
+class MockTTS(_Delayed):
+    def synth(self, text: str, lang: str) -> np.ndarray:
+        self.latency.wait(len(text.split()))
+        return self._inner.synth(text, lang)
+
+
+def with_latency(mock_cfg, asr, mt, tts):
+    """Обернуть mock-движки задержками из секции mock:; без задержек и сбоев — вернуть как есть."""
+    seed = mock_cfg.seed
+    out = []
+    for i, (name, engine, wrapper) in enumerate((("asr", asr, MockASR), ("mt", mt, MockMT), ("tts", tts, MockTTS))):
+        spec = getattr(mock_cfg, name)
+        if spec.ms <= 0 and spec.per_unit_ms <= 0 and spec.fail_rate <= 0:
+            out.append(engine)
+            continue
+        out.append(wrapper(engine, Latency(spec, None if seed is None else seed + i, name)))
+    return tuple(out)
+
+
+class SyntheticSpeech:
+    """
+    Синтетический вход: тон (энергия выше порога VAD) speech_ms, затем тишина silence_ms,
+    по кругу, всего duration_s секунд потока. Блоки отдаются в темпе speed × реальное время
+    (speed <= 0 — без пауз). Тот же интерфейс stream(), что у MicStream/WavStream.
+    """
+
+    def __init__(self, samplerate: int = 16000, block_ms: int = 500, speech_ms: int = 3000,
+                 silence_ms: int = 1000, duration_s: float = 60.0, speed: float = 1.0):
+        self.sr = samplerate
+        self.block = int(self.sr * block_ms / 1000)
+        self.speech = int(self.sr * speech_ms / 1000)
+        self.period = self.speech + int(self.sr * silence_ms / 1000)
+        self.total = int(self.sr * duration_s)
+        self.speed = speed
+
+    def stream(self) -> Iterable[np.ndarray]:
+        step = self.block / self.sr / self.speed if self.speed > 0 else 0.0
+        t0 = time.perf_counter()
+        for n, i in enumerate(range(0, self.total, self.block)):
+            if step:
+                delay = t0 + n * step - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            # блок генерируется на лету: длинный прогон не держит весь сигнал в памяти
+            idx = np.arange(i, min(i + self.block, self.total))
+            block = 0.2 * np.sin(2 * np.pi * 220 * idx / self.sr).astype(np.float32)
+            block[idx % self.period >= self.speech] = 0.0
+            yield block
+
+
+class MockPlayer(Player):
+    """«Воспроизведение» без звуковой карты: монитор эха отмечает интервал, поток ждёт длительность / speed."""
+
+    def __init__(self, sr: int = 16000, speed: float = 1.0):
+        super().__init__(device=None, volume=1.0, sr=sr)
+        self.speed = speed
+
+    def play(self, wav: np.ndarray):
+        t0 = self.monitor.begin(wav, self.sr)
+        try:
+            if self.speed > 0:
+                time.sleep(len(wav) / self.sr / self.speed)
+        finally:
+            self.monitor.end(t0)
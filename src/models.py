@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from .asr import ASR
+from .mt import MT
+from .tts import TTS
+from .placement import Placement
+from .resources import ThreadPlan, pinned_thread, plan_threads
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModelSet:
+    """Загруженные и прогретые модели конвейера + разбивка времени старта по компонентам."""
+    asr: ASR
+    mt: MT
+    tts: TTS
+    # компонент -> {"load": сек, "warmup": сек}
+    timings: dict[str, dict[str, float]] = field(default_factory=dict)
+    total_s: float = 0.0
+    placement: dict[str, Placement] = field(default_factory=dict)
+
+
+def _timed(timings: dict, name: str, stage: str, fn, *args):
+    t = time.perf_counter()
+    out = fn(*args)
+    timings.setdefault(name, {})[stage] = time.perf_counter() - t
+    return out
+
+
+def load_models(cfg, placement: dict[str, Placement], log=None,
+                plan: ThreadPlan | None = None) -> ModelSet:
+    """
+    Загрузить ASR, оба направления MT и TTS, затем прогреть ASR и MT.
+
+    При resources.parallel_load загрузка идёт на пуле потоков: тяжёлые части
+    (чтение весов, инициализация ctranslate2/torch) отпускают GIL, поэтому
+    компоненты реально грузятся одновременно. Прогрев каждого компонента (и каждого
+    направления MT) стартует сразу после его загрузки, в том же потоке. TTS не греется:
+    Piper запускается отдельным процессом на каждую фразу, прогревать нечего.
+    Ошибка любого компонента пробрасывается.
+    Устройство и тип вычислений каждого компонента берутся из placement (см. plan_placement).
+    """
+    t0 = time.perf_counter()
+    timings: dict[str, dict[str, float]] = {}
+    plan = plan or plan_threads(cfg.resources)
+    parallel = cfg.resources.parallel_load
+    warm = cfg.resources.warmup
+
+    def build_asr() -> ASR:
+        # Потоки ctranslate2 создаются здесь и наследуют привязку к ядрам стадии asr
+        with pinned_thread(plan.cpus.get("asr", []), "asr"):
+            asr = _timed(timings, "asr", "load", ASR,
+                         cfg.asr.engine, cfg.asr.model_path, cfg.asr.beam_size,
+                         cfg.asr.lang_detect, placement["asr"].device == "cuda", cfg.app.mock,
+                         plan.asr_threads, plan.asr_workers, placement["asr"].compute_type)
+            if warm:
+                _timed(timings, "asr", "warmup", asr.warmup, cfg.app.sample_rate)
+        return asr
+
+    def build_mt(side: str):
+        # Каждое направление прогревается сразу после своей загрузки, не дожидаясь другого
+        with pinned_thread(plan.cpus.get("mt", []), "mt"):
+            _timed(timings, mt_names[side], "load", mt.load, side)
+            if warm:
+                _timed(timings, mt_names[side], "warmup", mt.warmup, side)
+
+    mt = MT(
+        cfg.mt.engine,
+        cfg.mt.model_path,
+        placement["mt"].device == "cuda",
+        cfg.app.mock,
+        model_path_back=getattr(cfg.mt, "model_path_back", None),
+        load=False,
+        threads=plan.mt_threads,
+        interop_threads=plan.mt_interop,
+        compute_type=placement["mt"].compute_type,
+    )
+    mt_names = {"fwd": "mt.fwd", "back": "mt.back"}
+
+    tts = TTS(
+        cfg.tts.engine,
+        cfg.tts.voices.ru,
+        cfg.tts.voices.en,
+        placement["tts"].device == "cuda",
+        cfg.app.mock,
+        sr=cfg.app.sample_rate,
+        log=log,
+        cpus=plan.cpus.get("tts"),
+    )
+
+    # Задачи загрузки: независимые друг от друга
+    load_tasks = [build_asr] + [(lambda side=side: build_mt(side)) for side in mt.sides()]
+
+    if parallel:
+        with ThreadPoolExecutor(max_workers=len(load_tasks), thread_name_prefix="model_load") as pool:
+            futs = [pool.submit(fn) for fn in load_tasks]
+            results = [f.result() for f in futs]
+    else:
+        results = [fn() for fn in load_tasks]
+
+    asr = results[0]
+    if cfg.app.mock:
+        # задержки/сбои mock-движков (секция mock:) — после прогрева, чтобы не тормозить старт
+        from .mock import with_latency
+        asr, mt, tts = with_latency(cfg.mock, asr, mt, tts)
+    total = time.perf_counter() - t0
+    models = ModelSet(asr=asr, mt=mt, tts=tts, timings=timings, total_s=total)
+    log_startup(models, parallel)
+    return models
+
+
+def load_for_config(cfg, log=None, plan: ThreadPlan | None = None) -> ModelSet:
+    """Инвентаризация устройств + размещение + загрузка (общий вход для конвейера и сервера)."""
+    from .placement import DeviceInventory, describe_placement, detect_inventory, plan_placement
+
+    # в mock-режиме не трогаем ctranslate2 — это лишний тяжёлый импорт
+    inventory = DeviceInventory() if cfg.app.mock else detect_inventory()
+    placement = plan_placement(cfg, inventory)
+    logger.info("Размещение моделей: %s", describe_placement(placement))
+    models = load_models(cfg, placement, log=log, plan=plan)
+    models.placement = placement
+    return models
+
+
+def log_startup(models: ModelSet, parallel: bool):
+    parts = []
+    for name in sorted(models.timings):
+        st = models.timings[name]
+        parts.append(name + " " + " ".join(f"{k}={v:.2f}s" for k, v in st.items()))
+    logger.info(
+        "Старт моделей (%s): %s | всего %.2fs",
+        "параллельно" if parallel else "последовательно",
+        "; ".join(parts) or "—",
+        models.total_s,
+    )
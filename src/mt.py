@@ -50,9 +50,43 @@ def _ensure_cuda(module, *, component: str, enabled: bool) -> tuple[object, bool
 
     return module, enabled
 
+def _set_torch_threads(threads: int, interop: int):
+    """Ограничить пулы torch (процессные, torch у нас использует только MT)."""
+    if threads <= 0 and interop <= 0:
+        return
+    import torch  # type: ignore
+
+    if threads > 0 and torch.get_num_threads() != threads:
+        torch.set_num_threads(threads)
+    if interop > 0:
+        try:
+            torch.set_interop_threads(interop)
+        except RuntimeError:
+            # можно задать только до первой параллельной операции — повторный вызов не ошибка
+            pass
+
+def _apply_compute_type(model, compute_type: str | None, *, on_cuda: bool):
+    """float16 на GPU — half(); int8 на CPU — динамическая квантизация Linear-слоёв."""
+    if not compute_type or compute_type in ("auto", "float32", "default"):
+        return model
+    if on_cuda and compute_type == "float16":
+        return model.half()
+    if not on_cuda and compute_type.startswith("int8"):
+        import torch  # type: ignore
+
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    logger.warning("MT: тип вычислений %s не поддерживается для Marian на %s — оставляем float32",
+                   compute_type, "cuda" if on_cuda else "cpu")
+    return model
+
 class MT:
-    def __init__(self, engine: str, model_path: str, use_gpu: bool, mock: bool, model_path_back: str | None = None):
+    def __init__(self, engine: str, model_path: str, use_gpu: bool, mock: bool,
+                 model_path_back: str | None = None, load: bool = True,
+                 threads: int = 0, interop_threads: int = 0, compute_type: str | None = None):
         self.engine = engine
+        self.compute_type = compute_type        # None/"auto" — как раньше (float32 / default ct2)
+        self.threads = threads                  # 0 = по умолчанию фреймворка (все ядра)
+        self.interop_threads = interop_threads
         self.model_path = model_path
         self.model_path_back = model_path_back
         self.use_gpu = use_gpu
@@ -63,67 +97,120 @@ class MT:
         self.model_back = None
         self.tokenizer_back = None
 
-        if not mock:
-            if engine == "marian":
-                from transformers import MarianMTModel, MarianTokenizer  # type: ignore
-                # RU→EN
-                self.tokenizer = MarianTokenizer.from_pretrained(model_path)
-                self.model = MarianMTModel.from_pretrained(model_path)
-                self.model, self.use_gpu = _ensure_cuda(
-                    self.model,
-                    component="основная модель MarianMT",
-                    enabled=self.use_gpu,
-                )
-                # EN→RU (опционально)
-                if model_path_back:
-                    self.tokenizer_back = MarianTokenizer.from_pretrained(model_path_back)
-                    self.model_back = MarianMTModel.from_pretrained(model_path_back)
-                    self.model_back, self.use_gpu = _ensure_cuda(
-                        self.model_back,
-                        component="обратная модель MarianMT",
-                        enabled=self.use_gpu,
-                    )
-            elif engine == "nllb-ct2":
-                import ctranslate2  # type: ignore
-                # Для NLLB обычно нужен токенайзер и специальные языковые теги — TODO
-                self.model = ctranslate2.Translator(model_path, device="cuda" if use_gpu else "cpu")
-                if model_path_back:
-                    self.model_back = ctranslate2.Translator(model_path_back, device="cuda" if use_gpu else "cpu")
-            elif engine == "argos":
-                import argostranslate.package  # type: ignore
+        if engine not in ("marian", "nllb-ct2", "argos"):
+            raise ValueError(f"Unknown MT engine: {engine}")
+
+        # load=False: модели грузит вызывающий (например, параллельно по направлениям)
+        if not mock and load:
+            for side in self.sides():
+                self.load(side)
+
+    def sides(self) -> list[str]:
+        """Какие направления надо загрузить: "fwd" (model_path) и, если задан, "back"."""
+        return ["fwd", "back"] if self.model_path_back else ["fwd"]
+
+    def load(self, side: str = "fwd"):
+        """Загрузить одно направление; направления независимы и могут грузиться параллельно."""
+        if self.mock:
+            return
+        back = side == "back"
+        path = self.model_path_back if back else self.model_path
+        if self.engine == "marian":
+            from transformers import MarianMTModel, MarianTokenizer  # type: ignore
+            _set_torch_threads(self.threads, self.interop_threads)
+            tokenizer = MarianTokenizer.from_pretrained(path)
+            model = MarianMTModel.from_pretrained(path)
+            model, use_gpu = _ensure_cuda(
+                model,
+                component="обратная модель MarianMT" if back else "основная модель MarianMT",
+                enabled=self.use_gpu,
+            )
+            if not use_gpu:
+                self.use_gpu = False
+            model = _apply_compute_type(model, self.compute_type, on_cuda=use_gpu)
+            if back:
+                self.tokenizer_back, self.model_back = tokenizer, model
+            else:
+                self.tokenizer, self.model = tokenizer, model
+        elif self.engine == "nllb-ct2":
+            import ctranslate2  # type: ignore
+            # Для NLLB обычно нужен токенайзер и специальные языковые теги — TODO
+            model = ctranslate2.Translator(
+                path,
+                device="cuda" if self.use_gpu else "cpu",
+                compute_type=self.compute_type or "default",
+                intra_threads=self.threads,
+                inter_threads=max(self.interop_threads, 1),
+            )
+            if back:
+                self.model_back = model
             else:
-                raise ValueError(f"Unknown MT engine: {engine}")
+                self.model = model
+        elif self.engine == "argos":
+            import argostranslate.package  # type: ignore
+
+    def warmup(self, side: str | None = None):
+        """Короткий прогон направления side (None — всех загруженных) до первого запроса."""
+        if self.mock:
+            return
+        if side in (None, "fwd"):
+            self.translate("Привет.", "ru-en")
+        if side in (None, "back") and self.model_back is not None:
+            self.translate("Hello.", "en-ru")
 
     def translate(self, text: str, direction: str) -> str:
+        return self.translate_batch([text], direction)[0]
+
+    def translate_batch(self, texts: list[str], direction: str) -> list[str]:
+        """Перевести пачку фраз одного направления одним вызовом generate (с паддингом)."""
         if self.mock:
-            return "this is a test phrase" if direction == "ru-en" else "это тестовая фраза"
+            return ["this is a test phrase" if direction == "ru-en" else "это тестовая фраза"
+                    for _ in texts]
 
         if self.engine == "marian":
-            if direction == "ru-en":
-                tok = self.tokenizer(text, return_tensors="pt", padding=True)
-                if hasattr(self.model, "device") and str(self.model.device).startswith("cuda"):
-                    tok = {k: v.to("cuda") for k, v in tok.items()}
-                out = self.model.generate(**tok, num_beams=4, max_length=256)
-                return self.tokenizer.batch_decode(out, skip_special_tokens=True)[0]
-            else:  # en-ru
-                if not (self.model_back and self.tokenizer_back):
-                    # если второй модели нет — временно переводим той же (хуже качеством)
-                    tok = self.tokenizer(text, return_tensors="pt", padding=True)
-                    if hasattr(self.model, "device") and str(self.model.device).startswith("cuda"):
-                        tok = {k: v.to("cuda") for k, v in tok.items()}
-                    out = self.model.generate(**tok, num_beams=4, max_length=256)
-                    return self.tokenizer.batch_decode(out, skip_special_tokens=True)[0]
-                tok = self.tokenizer_back(text, return_tensors="pt", padding=True)
-                if hasattr(self.model_back, "device") and str(self.model_back.device).startswith("cuda"):
-                    tok = {k: v.to("cuda") for k, v in tok.items()}
-                out = self.model_back.generate(**tok, num_beams=4, max_length=256)
-                return self.tokenizer_back.batch_decode(out, skip_special_tokens=True)[0]
+            tokenizer, model = self._marian_for(direction)
+            tok = tokenizer(texts, return_tensors="pt", padding=True)
+            if hasattr(model, "device") and str(model.device).startswith("cuda"):
+                tok = {k: v.to("cuda") for k, v in tok.items()}
+            out = model.generate(**tok, num_beams=4, max_length=256)
+            return tokenizer.batch_decode(out, skip_special_tokens=True)
 
         elif self.engine == "nllb-ct2":
             # TODO: полноценная обвязка с токенайзером и языковыми тегами
-            return text
+            return list(texts)
 
         elif self.engine == "argos":
-            return text
+            return list(texts)
 
         raise RuntimeError("MT not initialized")
+
+    def translate_prefix(self, text: str, direction: str, prefix: str = "") -> str:
+        """
+        Перевод с принудительным началом prefix (уже озвученная часть): Marian получает
+        его токены как decoder_input_ids и декодирует только продолжение. Для движков
+        без такой возможности (ct2 NLLB до обвязки target_prefix, argos, mock) —
+        обычный перевод.
+        """
+        if not prefix or self.mock or self.engine != "marian":
+            return self.translate(text, direction)
+
+        import torch  # type: ignore
+
+        tokenizer, model = self._marian_for(direction)
+        tok = tokenizer([text], return_tensors="pt")
+        forced = tokenizer(text_target=[prefix], add_special_tokens=False, return_tensors="pt").input_ids
+        start = torch.full((1, 1), model.config.decoder_start_token_id, dtype=forced.dtype)
+        dec = torch.cat([start, forced], dim=1)
+        if hasattr(model, "device") and str(model.device).startswith("cuda"):
+            tok = {k: v.to("cuda") for k, v in tok.items()}
+            dec = dec.to("cuda")
+        out = model.generate(**tok, decoder_input_ids=dec, num_beams=4, max_length=256)
+        return tokenizer.decode(out[0], skip_special_tokens=True)
+
+    def _marian_for(self, direction: str):
+        if direction == "ru-en":
+            return self.tokenizer, self.model
+        if not (self.model_back and self.tokenizer_back):
+            # если второй модели нет — временно переводим той же (хуже качеством)
+            return self.tokenizer, self.model
+        return self.tokenizer_back, self.model_back
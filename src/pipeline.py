@@ -1,278 +1,491 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
-import queue
 import threading
 import time
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from .utils import (
     new_fragment,
     Fragment,
     Stopwatch,
-    clean_for_tts,   # санитайзер текста перед TTS
-    is_meaningful,   # фильтр пустых/мусорных строк
+    is_meaningful,     # фильтр пустых/мусорных строк
+    prepare_tts_text,  # санитайзер + фильтр числового мусора перед TTS
+    dir_from_lang,
 )
-from .asr import ASR
-from .mt import MT
-from .tts import TTS
 from .playback import Player
 from .vad import SimpleEnergyVAD
 from .logs import LogWriter
+from .resources import plan_threads
+from .scheduler import FairQueue, FragmentScheduler
+from .echo import EchoGate
+from .incremental import IncrementalTranslator
 
+if TYPE_CHECKING:  # модули движков грузятся лениво, в фоне (см. _load_models)
+    from .asr import ASR
+    from .mt import MT
+    from .tts import TTS
+    from .recorder import SessionRecorder
 
-logger = logging.getLogger(__name__)
 
+logger = logging.getLogger(__name__)
 
-def _resolve_gpu_flag(resources_cfg) -> bool:
-    """Определяет, использовать ли GPU для вычислений."""
-    requested = getattr(resources_cfg, "use_gpu", "auto")
-    if requested is True:
-        logger.info("GPU режим принудительно включён конфигом")
-        return True
-    if requested is False:
-        logger.info("GPU режим принудительно отключён конфигом")
-        return False
 
-    # Режим auto: проверяем наличие CUDA-устройств через ctranslate2
-    try:
-        import ctranslate2  # type: ignore
+def input_channels(cfg) -> int:
+    """Сколько каналов открывать на входе (по максимальному номеру в app.channels)."""
+    return max((ch.index for ch in cfg.app.channels), default=0) + 1
 
-        has_cuda = ctranslate2.get_cuda_device_count() > 0
-        if has_cuda:
-            logger.info("Обнаружена доступная GPU, включаем ускорение CUDA")
-            return True
-    except Exception as exc:  # pragma: no cover - диагностика окружения
-        logger.debug("Не удалось определить наличие GPU через ctranslate2: %s", exc)
 
-    logger.info("GPU не обнаружена — используем режим CPU")
-    return False
+def check_source_channels(cfg, available: int):
+    """Ошибка конфигурации, если app.channels ссылается на канал, которого у источника нет."""
+    need = input_channels(cfg)
+    if available < need:
+        raise ValueError(f"app.channels: указан канал {need - 1}, а у источника каналов: {available}")
 
 
 class Pipeline:
     """
     Реалтайм-конвейер:
-      Audio -> VAD -> ASR -> MT -> TTS -> Playback
+      Audio -> [по каналам: эхо-гейт -> VAD] -> ASR -> MT -> TTS -> [Playback]
+
+    Стадии (feed / recognize / translate / synthesize) связывает асинхронный драйвер
+    aio.AsyncPipeline; run() — его блокирующая обёртка с воспроизведением в динамик.
 
     Возможности:
       - Логи в текст: ASR, MT и сводный "dialog".
       - Проброс параметров Piper (если tts.engine == "piper") в ENV до инициализации TTS.
       - Две модели MT (ru→en и en→ru) через model_path / model_path_back.
+      - Параллельная загрузка и прогрев моделей в фоне, run() ждёт готовности.
+      - Устройство и тип вычислений — отдельно для ASR/MT/TTS (авто-размещение по бюджетам памяти).
+      - Бюджет потоков CPU делится между ASR/MT/TTS (resources.threads), опц. привязка к ядрам.
       - Фильтрация пустых/числовых фрагментов, санитайзер перед TTS.
-      - Лог входа в TTS: logs/tts_input_{ru|en}.txt
+      - Многоканальный вход (app.channels): свой VAD и направление на канал, общие модели,
+        ASR обслуживает каналы по кругу (FairQueue).
+      - Подавление эха TTS в микрофоне (safety.prevent_feedback_loop: mute_mic | ducking).
+      - Дедлайны фрагментов: устаревшие пропускаются, накопившиеся склеиваются (FragmentScheduler).
+      - Инкрементальный перевод длинных реплик (streaming.enabled): растущий префикс
+        переводится раз в streaming.interval_ms, устоявшиеся куски сразу идут в TTS.
+      - Лог входа в TTS: {logging.dir}/tts_input_{ru|en}.txt
+      - Запись логов в фоновом потоке (LogWriter), опционально JSONL с таймингами.
+      - Опциональная запись входа и TTS в WAV + индекс фрагментов (SessionRecorder).
     """
 
     def __init__(self, cfg, audio_src):
         self.cfg = cfg
         self.audio_src = audio_src
 
-        # Очередь: ASR -> MT/TTS
-        self.q_asr2mt: queue.Queue[Fragment] = queue.Queue(maxsize=32)
-        self.stop = threading.Event()
-
-        # Логи: отдельный сет файлов на каждую сессию
-        self.logger = LogWriter(log_dir=self.cfg.logging.dir)
-
-        # Плеер
-        self.player = Player(
-            device=cfg.tts.playback.device,
-            volume=cfg.tts.playback.volume,
-            sr=cfg.app.sample_rate,
+        # Очередь: ASR -> MT/TTS (дедлайны, слияние устаревающих, вытеснение старых)
+        self.q_asr2mt = FragmentScheduler(
+            maxsize=cfg.scheduling.queue_size,
+            merge_max_words=cfg.scheduling.merge_max_words,
+            on_discard=self._retract,
         )
+        self.max_lag = cfg.scheduling.max_lag_ms / 1000.0
+        # Живой источник (микрофон) не ждёт: устаревшее пропускаем, при переполнении вытесняем.
+        # Файл можно придержать — его чтение ждёт места в очередях, а дедлайнов нет.
+        # Драйвер (AsyncPipeline) выставляет флаг по своему источнику.
+        self.live = cfg.app.mode == "mic"
+        self.stop = threading.Event()
 
-        # Флаг GPU (auto-детект через ctranslate2)
-        use_gpu = _resolve_gpu_flag(cfg.resources)
-
-        # ASR
-        self.asr = ASR(
-            cfg.asr.engine,
-            cfg.asr.model_path,
-            cfg.asr.beam_size,
-            cfg.asr.lang_detect,
-            use_gpu,
-            cfg.app.mock,
+        # Логи: отдельный сет файлов на каждую сессию, запись в фоновом потоке
+        self.logger = LogWriter(
+            log_dir=self.cfg.logging.dir,
+            flush_interval_ms=cfg.logging.flush_interval_ms,
+            flush_max_lines=cfg.logging.flush_max_lines,
+            jsonl=cfg.logging.jsonl,
         )
 
-        # MT (две модели: прямое и обратное направления)
-        self.mt = MT(
-            cfg.mt.engine,
-            cfg.mt.model_path,
-            use_gpu,
-            cfg.app.mock,
-            model_path_back=getattr(cfg.mt, "model_path_back", None),
+        # Каналы входа: (номер, фиксированное направление | None для авто)
+        self.channels: list[tuple[int, str | None]] = (
+            [(ch.index, ch.dir) for ch in cfg.app.channels] or [(0, None)]
         )
-
-        # Проброс параметров Piper (если движок piper)
+        self.n_inputs = input_channels(cfg)
+        # Сегменты всех каналов -> общий ASR, по кругу между каналами
+        self.q_segments = FairQueue(maxsize_per_key=cfg.scheduling.segment_queue)
+
+        # Запись сессии (вход + TTS) — только по запросу конфига
+        self.recorder: SessionRecorder | None = None
+        if cfg.logging.save_input_wav or cfg.logging.save_tts_wav:
+            from .recorder import SessionRecorder
+            self.recorder = SessionRecorder(
+                log_dir=cfg.logging.dir,
+                session_prefix=self.logger.session_prefix,
+                sr=cfg.app.sample_rate,
+                block_ms=cfg.app.chunk_ms,
+                save_input=cfg.logging.save_input_wav,
+                save_tts=cfg.logging.save_tts_wav,
+                max_blocks=cfg.logging.record_queue_blocks,
+                channels=input_channels(cfg),
+            )
+
+        # Плеер (в mock-режиме можно без звуковой карты: mock.playback: sleep)
+        if cfg.app.mock and cfg.mock.playback == "sleep":
+            from .mock import MockPlayer
+            self.player = MockPlayer(sr=cfg.app.sample_rate)
+        else:
+            self.player = Player(
+                device=cfg.tts.playback.device,
+                volume=cfg.tts.playback.volume,
+                sr=cfg.app.sample_rate,
+            )
+        self.failures = 0  # вызовы ASR/MT/TTS, упавшие с ошибкой (фрагмент пропущен)
+
+        # Проброс параметров Piper (если движок piper) — до инициализации TTS
         if cfg.tts.engine == "piper" and getattr(cfg.tts, "piper", None):
             os.environ["PIPER_LENGTH"] = str(cfg.tts.piper.length_scale)
             os.environ["PIPER_NOISE"] = str(cfg.tts.piper.noise_scale)
             os.environ["PIPER_NOISE_W"] = str(cfg.tts.piper.noise_w)
 
-        # TTS
-        self.tts = TTS(
-            cfg.tts.engine,
-            cfg.tts.voices.ru,
-            cfg.tts.voices.en,
-            use_gpu,
-            cfg.app.mock,
-            sr=cfg.app.sample_rate,
+        # Бюджет потоков CPU между ASR / MT / TTS (+ привязка стадий к ядрам)
+        self.thread_plan = plan_threads(cfg.resources)
+        logger.info("Раскладка потоков: %s", self.thread_plan.describe())
+
+        # Модели (ASR, MT в обе стороны, TTS) грузятся и прогреваются в фоне;
+        # run() начинает захват только после сигнала готовности.
+        self.asr: ASR | None = None
+        self.mt: MT | None = None
+        self.tts: TTS | None = None
+        self.placement: dict = {}  # компонент -> Placement (заполняется при загрузке)
+        self.ready = threading.Event()
+        self._startup_error: BaseException | None = None
+        self._startup = threading.Thread(target=self._load_models, daemon=True, name="startup")
+        self._startup.start()
+
+        # VAD — свой на каждый канал (простая энергия; при желании заменить на Silero-VAD)
+        self.vads = {ch: self._make_vad() for ch, _ in self.channels}
+
+        # Инкрементальный перевод: своё состояние гипотезы на каждый канал
+        self.streams: dict[int, IncrementalTranslator] = {}
+        self._partial_at: dict[int, int] = {}
+        if cfg.streaming.enabled:
+            self.streams = {
+                ch: IncrementalTranslator(cfg.streaming.wait_k, cfg.streaming.min_commit_words)
+                for ch, _ in self.channels
+            }
+
+        # Подавление эха собственного TTS (только живой микрофон: в WAV-режиме динамик не слышен)
+        self.echo: dict[int, EchoGate] = {}
+        if cfg.app.mode == "mic" and cfg.safety.prevent_feedback_loop != "none":
+            self.echo = {
+                ch: EchoGate(
+                    mode=cfg.safety.prevent_feedback_loop,
+                    ducking_db=cfg.safety.ducking_db,
+                    monitor=self.player.monitor,
+                    vad=self._make_vad(),
+                    sr=cfg.app.sample_rate,
+                    tail_ms=cfg.safety.tail_ms,
+                )
+                for ch, _ in self.channels
+            }
+
+    # --------------------------- Публичный API ---------------------------
+
+    def wait_ready(self, timeout: float | None = None) -> bool:
+        """Дождаться загрузки и прогрева всех моделей. Ошибку загрузки пробрасывает."""
+        ok = self.ready.wait(timeout)
+        if self._startup_error is not None:
+            raise RuntimeError("Не удалось загрузить модели") from self._startup_error
+        return ok
+
+    def run(self):
+        """Запустить конвейер (блокирующе): асинхронный API + воспроизведение в динамик."""
+        probe = getattr(self.audio_src, "available_channels", None)
+        if probe is not None:
+            check_source_channels(self.cfg, probe())
+        self.wait_ready()
+        from .aio import AsyncPipeline, iterate_in_thread, play_fragments
+
+        async def main():
+            blocks = iterate_in_thread(self.audio_src.stream(), stop=self.stop, stamp=True)
+            await play_fragments(AsyncPipeline(self, live=self.live).fragments(blocks), self)
+
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            self.stop.set()
+        finally:
+            self.close()
+
+    def close(self):
+        """Записать итоговую статистику, закрыть запись сессии и логи."""
+        stats = self.stats()
+        logger.info("Статистика конвейера: %s", stats)
+        self.logger.log_record("scheduler", **stats)
+        if self.recorder is not None:
+            self.recorder.close()
+        self.logger.close()
+
+    # --------------------------- Стадии ---------------------------
+    # Вызываются драйвером из aio.py: feed — в цикле событий, остальные — в пулах потоков.
+
+    def feed(self, block, n_in: int, t_block: float) -> bool:
+        """
+        Блок входа (n_in — сэмплов с начала потока, включая этот; t_block — perf_counter()
+        конца его захвата): запись, эхо-гейт и VAD по каналам. Готовые сегменты — в очередь
+        ASR, их дедлайн отсчитывается от t_block; True, если такие появились.
+        """
+        have = block.shape[1] if block.ndim == 2 else 1
+        if have < self.n_inputs:  # источник без available_channels (async API) — проверяем по блоку
+            check_source_channels(self.cfg, have)
+        if self.recorder is not None:
+            self.recorder.push_input(block)
+
+        queued = False
+        for ch, _ in self.channels:
+            x = block[:, ch] if block.ndim == 2 else block
+
+            # Пока играет TTS — глушим/ослабляем микрофон до VAD
+            gate = self.echo.get(ch)
+            if gate is not None:
+                x = gate.process(x, t_block)
+
+            vad = self.vads[ch]
+            seg = vad.push(x)
+            if gate is not None:
+                gate.note_vad(seg is not None)
+            if seg is not None:
+                self._partial_at.pop(ch, None)
+                evicted = self.q_segments.put(ch, (seg, n_in, t_block, False))
+                if evicted is not None:
+                    # вытеснен закрытый сегмент: его префиксы не должны стать началом следующего
+                    self._end_stream(ch, evicted[1])
+                queued = True
+            elif self.streams and self._partial_due(ch, vad.pending_samples()):
+                # Незавершённый сегмент — префикс на инкрементальный перевод; при переполнении
+                # вытесняется первым и никогда не вытесняет закрытые сегменты
+                self.q_segments.put(ch, (vad.partial(), n_in, t_block, True), disposable=True)
+                queued = True
+        return queued
+
+    def _partial_due(self, ch: int, pending: int) -> bool:
+        step = int(self.cfg.app.sample_rate * self.cfg.streaming.interval_ms / 1000)
+        if pending - self._partial_at.get(ch, 0) < max(step, 1):
+            return False
+        self._partial_at[ch] = pending
+        return True
+
+    def recognize(self, ch: int, seg, n_end: int, t_capture: float, t0: float,
+                  partial: bool = False) -> Fragment | None:
+        """
+        ASR сегмента канала ch -> фрагмент (None: устарел в очереди или мусор).
+        partial — префикс незавершённого сегмента (инкрементальный режим): не логируется как ASR.
+        """
+        # Сегмент устарел, пока ждал ASR, — не тратим на него распознавание
+        if self.live and self.max_lag > 0 and time.perf_counter() > t_capture + self.max_lag:
+            if not partial:
+                self.q_asr2mt.note_expired()
+                self._end_stream(ch, n_end)
+            return None
+
+        sr = self.cfg.app.sample_rate
+        mt_dir = dict(self.channels).get(ch)
+        sw = Stopwatch()
+        lang, text = self.asr.transcribe_segment(seg, sr, language=self._asr_language(mt_dir))
+        asr_ms = sw.ms()
+
+        # Отбрасываем пустые/мусорные распознавания (шум, «тишина», служебное)
+        if not is_meaningful(text, min_len=3):
+            if not partial:
+                self._end_stream(ch, n_end)
+            return None
+
+        t_start = time.perf_counter() - t0
+        frag = new_fragment(
+            t_start=t_start,
+            t_end=t_start + len(seg) / sr,
+            src_lang=lang or "auto",
+            text=text,
+            mt_dir=mt_dir or self._dir_from_lang(lang),
+        )
+        frag.channel = ch
+        frag.timings["asr_ms"] = asr_ms
+        frag.in_offset = n_end - len(seg)
+        frag.in_len = len(seg)
+        frag.t_capture = t_capture
+        if self.live and self.max_lag > 0:
+            frag.deadline = t_capture + self.max_lag
+        if partial:
+            frag.final = False
+            return frag
+        if self.recorder is not None:
+            self.recorder.mark_input(frag.fragment_id, frag.in_offset, frag.in_len)
+
+        # Лог ASR-сегмента
+        self.logger.log_asr(
+            fragment_id=frag.fragment_id,
+            t_start=frag.t_start,
+            t_end=frag.t_end,
+            src_lang=frag.src_lang,
+            text=frag.asr_text,
         )
+        return frag
 
-        # VAD (простая энергия; при желании заменить на Silero-VAD)
-        self.vad = SimpleEnergyVAD(
-            threshold=0.0008,  # можно вынести в конфиг при необходимости
-            min_speech_ms=cfg.vad.min_speech_ms,
-            min_silence_ms=cfg.vad.min_silence_ms,
-            sr=cfg.app.sample_rate,
+    def translate_incremental(self, frag: Fragment) -> bool:
+        """
+        Шаг инкрементального перевода (frag.final — сегмент закрыт): frag.mt_text получает
+        новый устоявшийся кусок перевода. False — озвучивать пока нечего.
+        """
+        sw = Stopwatch()
+        stream = self.streams[frag.channel]
+        chunk = stream.step(
+            self.mt, frag.asr_text, frag.mt_dir, frag.in_offset + frag.in_len, frag.final)
+        frag.timings["mt_ms"] = sw.ms()
+        if not chunk or not is_meaningful(chunk, min_len=2):
+            return False
+        frag.mt_text = chunk
+        frag.stream_epoch = stream.last_epoch
+        self.logger.log_mt(
+            fragment_id=frag.fragment_id,
+            direction=frag.mt_dir,
+            src_text=frag.asr_text,
+            hyp_text=chunk,
         )
+        if frag.final:
+            self.logger.log_dialog(
+                fragment_id=frag.fragment_id,
+                src_lang=frag.src_lang,
+                direction=frag.mt_dir,
+                asr_text=frag.asr_text,
+                mt_text=self.streams[frag.channel].policy.final_text,
+            )
+        return True
 
-    # --------------------------- Публичный API ---------------------------
+    def _retract(self, frag: Fragment):
+        """Кусок инкрементального перевода не прозвучал — убрать его из озвученного префикса."""
+        stream = self.streams.get(frag.channel)
+        if stream is not None and frag.stream_epoch is not None and frag.mt_text:
+            stream.retract(frag.mt_text, frag.stream_epoch)
+
+    def _end_stream(self, ch: int, n_end: int):
+        stream = self.streams.get(ch)
+        if stream is not None:
+            stream.end(n_end)
+
+    def translate(self, frag: Fragment) -> bool:
+        """MT фрагмента (заполняет frag.mt_text); False — нечего переводить или пустой перевод."""
+        # Кусок инкрементального режима уже переведён
+        if frag.mt_text is not None:
+            return True
 
-    def run(self):
-        """Запустить конвейер (блокирующе)."""
-        t0 = time.perf_counter()
-
-        def asr_loop():
-            sr = self.cfg.app.sample_rate
-            for block in self.audio_src.stream():
-                if self.stop.is_set():
-                    break
-
-                seg = self.vad.push(block)
-                if seg is None:
-                    continue
-
-                lang, text = self.asr.transcribe_segment(seg, sr)
-
-                # Отбрасываем пустые/мусорные распознавания (шум, «тишина», служебное)
-                if not is_meaningful(text, min_len=3):
-                    continue
-
-                mt_dir = self._dir_from_lang(lang)
-                t_start = time.perf_counter() - t0
-
-                frag = new_fragment(
-                    t_start=t_start,
-                    t_end=t_start + len(seg) / sr,
-                    src_lang=lang or "auto",
-                    text=text,
-                    mt_dir=mt_dir,
-                )
+        # Перевод — только если есть осмысленный текст
+        src_txt = (frag.asr_text or "").strip()
+        if not is_meaningful(src_txt, min_len=3):
+            return False
 
-                # Лог ASR-сегмента
-                self.logger.log_asr(
-                    fragment_id=frag.fragment_id,
-                    t_start=frag.t_start,
-                    t_end=frag.t_end,
-                    src_lang=frag.src_lang,
-                    text=frag.asr_text,
-                )
+        sw = Stopwatch()
+        hyp = self.mt.translate(src_txt, frag.mt_dir)
+        frag.timings["mt_ms"] = sw.ms()
 
-                # Неблокирующая попытка положить фрагмент
-                try:
-                    self.q_asr2mt.put(frag, timeout=0.2)
-                except queue.Full:
-                    # Если очередь заполнена — пропускаем, чтобы не накапливать задержку
-                    pass
+        # Подстраховка: если MT вернул пустое/шум — пропускаем
+        if not is_meaningful(hyp, min_len=2):
+            return False
 
-            # Источник исчерпан или остановка — сигналим воркеру
-            self.stop.set()
+        frag.mt_text = hyp
 
-        def worker_loop():
-            while not self.stop.is_set() or not self.q_asr2mt.empty():
-                try:
-                    frag = self.q_asr2mt.get(timeout=0.2)
-                except queue.Empty:
-                    continue
+        # Логи MT + сводный «диалог»
+        self.logger.log_mt(
+            fragment_id=frag.fragment_id,
+            direction=frag.mt_dir,
+            src_text=src_txt,
+            hyp_text=hyp,
+        )
+        self.logger.log_dialog(
+            fragment_id=frag.fragment_id,
+            src_lang=frag.src_lang,
+            direction=frag.mt_dir,
+            asr_text=src_txt,
+            mt_text=hyp,
+        )
+        return True
 
-                _ = Stopwatch()  # при желании использовать для измерений
+    def synthesize(self, frag: Fragment) -> bool:
+        """
+        TTS перевода (заполняет frag.tts_text / frag.tts_audio). Текст, который нечего
+        озвучивать, оставляет фрагмент без звука; False — фрагмент устарел, пропускаем.
+        """
+        # Санитизируем текст перед синтезом (уберём id/SRC/TRG/UUID, числовой мусор)
+        tts_text = prepare_tts_text(frag.mt_text or "")
+        if tts_text is None:
+            return True
 
-                # Перевод — только если есть осмысленный текст
-                src_txt = (frag.asr_text or "").strip()
-                if not is_meaningful(src_txt, min_len=3):
-                    continue
+        # Пока переводили, фрагмент мог устареть — не озвучиваем опоздавшее
+        if self.q_asr2mt.expire(frag):
+            return False
 
-                hyp = self.mt.translate(src_txt, frag.mt_dir)
+        # ---- Лог входа TTS (ru/en) ----
+        out_lang = "en" if frag.mt_dir == "ru-en" else "ru"
+        self.logger.log_tts_input(out_lang, tts_text)
 
-                # Подстраховка: если MT вернул пустое/шум — пропускаем
-                if not is_meaningful(hyp, min_len=2):
-                    continue
+        sw = Stopwatch()
+        frag.tts_audio = self.tts.synth(tts_text, out_lang)
+        frag.tts_text = tts_text
+        frag.timings["tts_ms"] = sw.ms()
+        if self.recorder is not None:
+            self.recorder.push_tts(frag.fragment_id, frag.tts_audio)
+        return True
 
-                frag.mt_text = hyp
+    def log_fragment(self, frag: Fragment):
+        """JSONL-запись готового фрагмента (id, тексты, тайминги, задержка от захвата)."""
+        self.logger.log_record(
+            "fragment",
+            fragment_id=frag.fragment_id,
+            t_start=round(frag.t_start, 3),
+            t_end=round(frag.t_end, 3),
+            src_lang=frag.src_lang,
+            direction=frag.mt_dir,
+            asr_text=frag.asr_text,
+            mt_text=frag.mt_text,
+            tts_text=frag.tts_text,
+            timings=frag.timings,
+            merged_ids=frag.merged_ids,
+            final=frag.final,
+            lag_ms=int((time.perf_counter() - frag.t_capture) * 1000),
+        )
 
-                # Логи MT + сводный «диалог»
-                self.logger.log_mt(
-                    fragment_id=frag.fragment_id,
-                    direction=frag.mt_dir,
-                    src_text=src_txt,
-                    hyp_text=hyp,
-                )
-                self.logger.log_dialog(
-                    fragment_id=frag.fragment_id,
-                    src_lang=frag.src_lang,
-                    direction=frag.mt_dir,
-                    asr_text=src_txt,
-                    mt_text=hyp,
-                )
+    def stats(self) -> dict[str, int]:
+        """
+        Счётчики: планировщик (expired / merged / dropped), очередь сегментов перед ASR
+        (segments_dropped), сбои движков (failed) и эхо-гейт по всем каналам
+        (echo_gated_blocks / asr_avoided).
+        """
+        out = self.q_asr2mt.stats.as_dict()
+        out["segments_dropped"] = self.q_segments.dropped
+        out["failed"] = self.failures
+        for gate in self.echo.values():
+            for k, v in gate.stats().items():
+                out[k] = out.get(k, 0) + v
+        return out
 
-                # Санитизируем текст перед синтезом (уберём id/SRC/TRG/UUID и т.п.)
-                tts_text = clean_for_tts(hyp)
-                if not is_meaningful(tts_text, min_len=2):
-                    continue
-
-                # ---- Жёсткая фильтрация числового мусора ----
-                def _digits_ratio(s: str) -> float:
-                    n = len(s.strip())
-                    if n == 0:
-                        return 1.0
-                    d = sum(ch.isdigit() for ch in s)
-                    sym = sum(ch in "-_:.;,/#$%&*+=()[]{}" for ch in s)
-                    return (d + sym) / n
-
-                if _digits_ratio(tts_text) > 0.6:
-                    continue
-
-                # ---- Лог входа TTS (ru/en) ----
-                try:
-                    os.makedirs("logs", exist_ok=True)
-                    lang_tag = "en" if frag.mt_dir == "ru-en" else "ru"
-                    with open(os.path.join("logs", f"tts_input_{lang_tag}.txt"), "a", encoding="utf-8") as f:
-                        f.write(tts_text + "\n")
-                except Exception:
-                    pass
-
-                # Синтез
-                out_lang = "en" if frag.mt_dir == "ru-en" else "ru"
-                wav = self.tts.synth(tts_text, out_lang)
-
-                # Воспроизведение
-                self.player.play(wav)
-
-        t_asr = threading.Thread(target=asr_loop, daemon=True, name="asr_loop")
-        t_work = threading.Thread(target=worker_loop, daemon=True, name="worker_loop")
-        t_asr.start()
-        t_work.start()
+    # --------------------------- Вспомогательные ---------------------------
 
+    def _make_vad(self) -> SimpleEnergyVAD:
+        return SimpleEnergyVAD(
+            threshold=0.0008,  # можно вынести в конфиг при необходимости
+            min_speech_ms=self.cfg.vad.min_speech_ms,
+            min_silence_ms=self.cfg.vad.min_silence_ms,
+            sr=self.cfg.app.sample_rate,
+        )
+
+    def _load_models(self):
         try:
-            while t_asr.is_alive() and t_work.is_alive():
-                time.sleep(0.1)
-        except KeyboardInterrupt:
-            self.stop.set()
+            # Размещение по устройствам (инвентаризация GPU/RAM + бюджеты из конфига) и загрузка
+            from .models import load_for_config
+            models = load_for_config(self.cfg, log=self.logger, plan=self.thread_plan)
+            self.placement = models.placement
+            self.asr, self.mt, self.tts = models.asr, models.mt, models.tts
+        except BaseException as exc:
+            self._startup_error = exc
         finally:
-            t_asr.join(timeout=1.0)
-            t_work.join(timeout=1.0)
+            self.ready.set()
 
-    # --------------------------- Вспомогательные ---------------------------
+    def _asr_language(self, mt_dir: str | None) -> str | None:
+        """Язык для ASR: из фиксированного направления канала, иначе из app.src_lang."""
+        if mt_dir:
+            return mt_dir.split("-")[0]
+        return None if self.cfg.app.src_lang == "auto" else self.cfg.app.src_lang
 
     def _dir_from_lang(self, lang: Optional[str]) -> str:
-        """
-        Выбрать направление перевода:
-          - если в конфиге задано явно (ru-en / en-ru), берём его;
-          - иначе отталкиваемся от языка ASR (ru* -> ru-en, иначе en-ru).
-        """
-        if self.cfg.app.dir != "auto":
-            return self.cfg.app.dir
-        if (lang or "").lower().startswith("ru"):
-            return "ru-en"
-        return "en-ru"
+        """Направление перевода: app.dir, если задано явно, иначе по языку ASR."""
+        return dir_from_lang(lang, self.cfg.app.dir)
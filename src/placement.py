@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import logging
+import os
+import subprocess
+from dataclasses import dataclass
+
+
+logger = logging.getLogger(__name__)
+
+# Байт на вес для типов вычислений ctranslate2/torch
+_BYTES_PER_WEIGHT = {
+    "float32": 4.0, "float16": 2.0, "bfloat16": 2.0,
+    "int8_float32": 1.0, "int8_float16": 1.0, "int8_bfloat16": 1.0, "int8": 1.0,
+    "int16": 2.0, "default": 2.0,
+}
+
+# В каком типе обычно лежат веса на диске (ct2-конвертация whisper/NLLB — float16, HF/ONNX — float32)
+_STORED_DTYPE = {"faster-whisper": "float16", "nllb-ct2": "float16", "marian": "float32",
+                 "piper": "float32", "vosk": "float32", "argos": "float32", "silero": "float32"}
+
+# Запас на активации, KV-кэш, буферы декодера
+_OVERHEAD = 1.3
+
+# Оценки, если модели нет на диске (МБ в «родном» типе хранения)
+_FALLBACK_MB = {"tiny": 75, "base": 145, "small": 480, "medium": 1500, "large": 3100,
+                "marian": 300, "nllb": 1200, "piper": 65}
+
+# «Авто»-тип вычислений по движку и устройству (совпадает с прежним поведением)
+_AUTO_COMPUTE = {
+    ("faster-whisper", "cuda"): "float16", ("faster-whisper", "cpu"): "int8",
+    ("nllb-ct2", "cuda"): "float16", ("nllb-ct2", "cpu"): "int8",
+    ("marian", "cuda"): "float32", ("marian", "cpu"): "float32",
+    ("piper", "cuda"): "float32", ("piper", "cpu"): "float32",
+}
+# Более компактные варианты для GPU, если основной не помещается в бюджет VRAM
+_CUDA_FALLBACK_COMPUTE = {"faster-whisper": ["int8_float16"], "nllb-ct2": ["int8_float16"],
+                          "marian": ["float16"]}
+
+
+@dataclass
+class DeviceInventory:
+    """Что есть на машине. В тестах подставляется вручную вместо detect_inventory()."""
+    cuda_devices: int = 0
+    vram_mb: int = 0   # свободная VRAM на устройстве 0
+    ram_mb: int = 0    # доступная RAM; 0 — неизвестно
+
+
+@dataclass
+class Placement:
+    device: str          # "cpu" | "cuda"
+    compute_type: str    # "auto" уже разрешён в конкретный тип
+    est_mb: int
+    reason: str = ""
+
+
+def _cuda_info() -> tuple[int, int]:
+    count = 0
+    try:
+        import ctranslate2  # type: ignore
+
+        count = ctranslate2.get_cuda_device_count()
+    except Exception as exc:  # pragma: no cover - диагностика окружения
+        logger.debug("Не удалось определить наличие GPU через ctranslate2: %s", exc)
+    if count <= 0:
+        return 0, 0
+    try:
+        creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        out = subprocess.run(
+            ["nvidia-smi", "--query-gpu=memory.free", "--format=csv,noheader,nounits"],
+            capture_output=True, text=True, timeout=5, creationflags=creationflags,
+        )
+        return count, int(out.stdout.strip().splitlines()[0])
+    except Exception as exc:  # pragma: no cover - зависит от драйвера
+        logger.debug("nvidia-smi недоступен, объём VRAM неизвестен: %s", exc)
+        return count, 0
+
+
+def _ram_available_mb() -> int:
+    try:
+        import psutil  # type: ignore
+
+        return int(psutil.virtual_memory().available / 2**20)
+    except ImportError:
+        pass
+    try:
+        return int(os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 2**20)
+    except (ValueError, OSError, AttributeError):  # pragma: no cover - Windows без psutil
+        return 0
+
+
+def detect_inventory() -> DeviceInventory:
+    count, vram = _cuda_info()
+    return DeviceInventory(cuda_devices=count, vram_mb=vram, ram_mb=_ram_available_mb())
+
+
+def _disk_mb(path: str | None) -> int:
+    if not path:
+        return 0
+    if os.path.isfile(path):
+        return int(os.path.getsize(path) / 2**20)
+    if not os.path.isdir(path):
+        return 0
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            if name.endswith((".bin", ".safetensors", ".onnx", ".pt", ".model")):
+                total += os.path.getsize(os.path.join(root, name))
+    return int(total / 2**20)
+
+
+def _fallback_mb(engine: str, path: str | None) -> int:
+    # Сначала движок: в именах голосов Piper тоже встречается «medium»
+    if engine == "marian":
+        return _FALLBACK_MB["marian"]
+    if engine == "nllb-ct2":
+        return _FALLBACK_MB["nllb"]
+    if engine in ("piper", "silero"):
+        return _FALLBACK_MB["piper"]
+    name = os.path.basename((path or "").rstrip("/\\")).lower()
+    for key in ("tiny", "base", "small", "medium", "large"):
+        if key in name:
+            return _FALLBACK_MB[key]
+    return _FALLBACK_MB["medium"]
+
+
+def estimate_footprint_mb(engine: str, paths: list[str | None], compute_type: str) -> int:
+    """
+    Грубая оценка памяти под модель: размер весов на диске, пересчитанный
+    из типа хранения в тип вычислений, плюс запас на активации.
+    """
+    stored = _BYTES_PER_WEIGHT[_STORED_DTYPE.get(engine, "float32")]
+    target = _BYTES_PER_WEIGHT.get(compute_type, stored)
+    total = 0.0
+    for p in paths:
+        if p is None:
+            continue
+        mb = _disk_mb(p) or _fallback_mb(engine, p)
+        total += mb * target / stored
+    return int(total * _OVERHEAD)
+
+
+def _auto_compute(engine: str, device: str) -> str:
+    return _AUTO_COMPUTE.get((engine, device), "default" if device == "cuda" else "float32")
+
+
+def plan_placement(cfg, inventory: DeviceInventory) -> dict[str, Placement]:
+    """
+    Разместить ASR, MT и TTS по устройствам с учётом бюджетов памяти.
+
+    Явный device ("cpu"/"cuda") в секции компонента соблюдается (cuda без GPU -> cpu).
+    device "auto" жадно кладёт компоненты на GPU в порядке asr -> mt -> tts, пока
+    оценка помещается в resources.vram_budget_mb (и в свободную VRAM); иначе — CPU.
+    Для "auto"-типа вычислений на GPU пробуется более компактный вариант
+    (например, int8_float16), если основной не помещается.
+    resources.use_gpu: false запрещает GPU для "auto"-компонентов, true — ставит их
+    на GPU как при явном device: cuda (без проверки бюджета VRAM), как было до авторазмещения.
+    """
+    res = cfg.resources
+    allow_gpu = res.use_gpu is not False and inventory.cuda_devices > 0
+
+    # None — объём неизвестен, ограничения нет
+    budgets = [b for b in (inventory.vram_mb or None, res.vram_budget_mb) if b is not None]
+    vram_left: int | None = min(budgets) if budgets else None
+    budgets = [b for b in (inventory.ram_mb or None, res.ram_budget_mb) if b is not None]
+    ram_left: int | None = min(budgets) if budgets else None
+
+    components = [
+        ("asr", cfg.asr.engine, [cfg.asr.model_path], cfg.asr.device, cfg.asr.compute_type),
+        ("mt", cfg.mt.engine, [cfg.mt.model_path, cfg.mt.model_path_back],
+         cfg.mt.device, cfg.mt.compute_type),
+        ("tts", cfg.tts.engine, [cfg.tts.voices.ru, cfg.tts.voices.en], cfg.tts.device, "auto"),
+    ]
+
+    out: dict[str, Placement] = {}
+    for name, engine, paths, device, compute in components:
+        placed = None
+        forced = device == "auto" and res.use_gpu is True
+        if forced:
+            device = "cuda"
+        if device == "cuda" and inventory.cuda_devices == 0:
+            reason = "cuda запрошена, но GPU нет"
+            device = "cpu"
+        elif device == "cuda":
+            ct = _auto_compute(engine, "cuda") if compute == "auto" else compute
+            placed = Placement("cuda", ct, estimate_footprint_mb(engine, paths, ct),
+                               "resources.use_gpu: true" if forced else "задано конфигом")
+        elif device == "auto" and allow_gpu:
+            cands = [compute] if compute != "auto" else (
+                [_auto_compute(engine, "cuda")] + _CUDA_FALLBACK_COMPUTE.get(engine, []))
+            for ct in cands:
+                est = estimate_footprint_mb(engine, paths, ct)
+                if vram_left is None or est <= vram_left:
+                    placed = Placement("cuda", ct, est, "auto: помещается в VRAM")
+                    break
+            reason = "auto: не помещается в бюджет VRAM"
+        else:
+            reason = "задано конфигом" if device == "cpu" else "auto: GPU недоступна/запрещена"
+
+        if placed is not None:
+            if vram_left is not None:
+                vram_left = max(vram_left - placed.est_mb, 0)
+        else:
+            ct = _auto_compute(engine, "cpu") if compute == "auto" else compute
+            est = estimate_footprint_mb(engine, paths, ct)
+            if ram_left is not None:
+                if est > ram_left:
+                    # CPU — последний вариант: размещаем, но предупреждаем
+                    reason += f"; оценка {est} МБ превышает бюджет RAM {ram_left} МБ"
+                    logger.warning("%s: оценка %d МБ превышает бюджет RAM %d МБ", name, est, ram_left)
+                ram_left = max(ram_left - est, 0)
+            placed = Placement("cpu", ct, est, reason)
+        out[name] = placed
+    return out
+
+
+def describe_placement(placement: dict[str, Placement]) -> str:
+    return "; ".join(f"{k}={p.device}/{p.compute_type} ~{p.est_mb}MB ({p.reason})"
+                     for k, p in placement.items())
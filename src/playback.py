@@ -1,5 +1,6 @@
 from __future__ import annotations
-import sounddevice as sd
+import threading
+import time
 import numpy as np
 
 def _resolve_device(device: str | int | None):
@@ -15,6 +16,7 @@ def _resolve_device(device: str | int | None):
             return int(s)
         # поиск по подстроке имени среди выходных устройств
         try:
+            import sounddevice as sd
             devs = sd.query_devices()
             outs = [(i, d) for i, d in enumerate(devs) if d.get("max_output_channels", 0) > 0]
             for i, d in outs:
@@ -28,17 +30,74 @@ def _resolve_device(device: str | int | None):
         return device
     return None
 
+class PlaybackMonitor:
+    """
+    Что и когда играет плеер: интервалы воспроизведения (по часам time.perf_counter)
+    и огибающая выходного сигнала (RMS по кадрам frame_ms).
+    Читается потоком захвата для подавления эха собственного TTS.
+    """
+    def __init__(self, frame_ms: int = 20, keep: int = 32):
+        self.frame_s = frame_ms / 1000.0
+        self.keep = keep
+        self._lock = threading.Lock()
+        # (t_start, t_end, огибающая по кадрам)
+        self._items: list[tuple[float, float, np.ndarray]] = []
+
+    def begin(self, wav: np.ndarray, sr: int) -> float:
+        t0 = time.perf_counter()
+        n = max(int(sr * self.frame_s), 1)
+        frames = len(wav) // n
+        env = np.sqrt((wav[:frames * n].reshape(frames, n) ** 2).mean(axis=1)) if frames else np.zeros(0)
+        with self._lock:
+            self._items.append((t0, t0 + len(wav) / sr, env.astype("float32")))
+            del self._items[:-self.keep]
+        return t0
+
+    def end(self, t0: float):
+        """Фактический конец (если воспроизведение прервали раньше)."""
+        t1 = time.perf_counter()
+        with self._lock:
+            for i, (a, b, env) in enumerate(self._items):
+                if a == t0:
+                    self._items[i] = (a, min(b, t1), env)
+
+    def active(self, t0: float, t1: float, tail_s: float = 0.0) -> bool:
+        """Пересекается ли окно [t0, t1] с воспроизведением (с учётом хвоста реверберации)."""
+        with self._lock:
+            return any(a < t1 and t0 < b + tail_s for a, b, _ in self._items)
+
+    def envelope(self, t0: float, t1: float, tail_s: float = 0.0) -> float:
+        """Максимальная огибающая выхода в окне [t0 - tail_s, t1]; 0 — тишина."""
+        lo = t0 - tail_s
+        peak = 0.0
+        with self._lock:
+            for a, b, env in self._items:
+                if not (a < t1 and lo < b) or env.size == 0:
+                    continue
+                i0 = max(int((lo - a) / self.frame_s), 0)
+                i1 = min(int((t1 - a) / self.frame_s) + 1, env.size)
+                if i1 > i0:
+                    peak = max(peak, float(env[i0:i1].max()))
+        return peak
+
+
 class Player:
     def __init__(self, device: str | int | None = None, volume: float = 1.0, sr: int = 16000):
         self.device = _resolve_device(device)
         self.volume = volume
         self.sr = sr
+        self.monitor = PlaybackMonitor()
 
     def play(self, wav: np.ndarray):
+        import sounddevice as sd  # лениво: импорт PortAudio только при реальном воспроизведении
+        out = wav * self.volume
+        t0 = self.monitor.begin(out, self.sr)
         try:
-            sd.play(wav * self.volume, self.sr, device=self.device)
+            sd.play(out, self.sr, device=self.device)
             sd.wait()
         except ValueError:
             # Если указали несуществующее устройство — пробуем системное по умолчанию
-            sd.play(wav * self.volume, self.sr, device=None)
+            sd.play(out, self.sr, device=None)
             sd.wait()
+        finally:
+            self.monitor.end(t0)
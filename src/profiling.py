@@ -0,0 +1,380 @@
+"""
+Профилирование живой сессии (python -m src.app ... --profile).
+
+- Сэмплирующий профайлер: раз в interval_ms снимает стеки всех потоков
+  (sys._current_frames) и раскладывает их по стадиям по имени потока
+  (asr_0 -> asr, mt_0 -> mt, MainThread -> loop: захват, эхо-гейт, VAD).
+  Ожидание в очередях/селекторе считается простоем и в топ не попадает.
+  CPU-время потоков — из /proc (Linux).
+- tracemalloc: раз в mem_interval_s снимок, аллокации разнесены по категориям
+  (буфер VAD, ресемплинг, токенизация, ...) по стеку вызова. Память числится за
+  местом выделения: блоки, которые VAD лишь держит, — за источником звука.
+- RSS и память GPU во времени.
+
+При остановке в logging.dir пишутся:
+  {session}_profile_stacks.txt   — свёрнутые стеки "стадия;функция;... N" (flamegraph.pl, speedscope)
+  {session}_profile_memory.jsonl — ряд RSS / GPU / категорий аллокаций
+  {session}_profile_summary.txt  — сводка: стадии, топ-N функций, топ-N аллокаций
+
+Без --profile модуль не импортируется: в рабочих потоках нет ни одного хука.
+"""
+from __future__ import annotations
+
+import collections
+import inspect
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+
+
+logger = logging.getLogger(__name__)
+
+# Категории аллокаций: (категория, подстрока пути, функция | None — весь файл).
+# Стек аллокации просматривается от внутреннего кадра наружу, первое совпадение выигрывает.
+ALLOC_CATEGORIES: list[tuple[str, str, str | None]] = [
+    ("imports", "<frozen importlib", None),   # код и константы модулей при импорте
+    ("resample", "src/tts.py", "_resample_linear"),
+    ("vad_buffer", "src/vad.py", None),
+    ("echo_gate", "src/echo.py", None),
+    ("playback", "src/playback.py", None),
+    ("recorder", "src/recorder.py", None),
+    ("logs", "src/logs.py", None),
+    ("audio_in", "src/audio_in.py", None),
+    ("tokenize", "/transformers/tokenization", None),
+    ("tokenize", "/sentencepiece/", None),
+    ("asr_model", "/faster_whisper/", None),
+    ("asr_model", "/ctranslate2/", None),
+    ("mt_model", "/transformers/", None),
+    ("mt_model", "/torch/", None),
+    ("asr", "src/asr.py", None),
+    ("mt", "src/mt.py", None),
+    ("tts", "src/tts.py", None),
+    ("mock", "src/mock.py", None),
+    ("pipeline", "src/", None),
+]
+
+# Листовые кадры, в которых поток ждёт работы (простой, а не CPU)
+_IDLE = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),  # concurrent.futures: ожидание задачи
+}
+
+_THREAD_SUFFIX = re.compile(r"_\d+$")
+
+
+def stage_of(thread_name: str) -> str:
+    """Имя потока -> стадия: asr_0 -> asr, MainThread -> loop (цикл событий: захват, эхо, VAD)."""
+    if thread_name == "MainThread":
+        return "loop"
+    return _THREAD_SUFFIX.sub("", thread_name)
+
+
+def _norm(path: str) -> str:
+    return path.replace("\\", "/")
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _thread_cpu_s(native_id: int | None) -> float | None:
+    """utime + stime потока из /proc (только Linux)."""
+    if native_id is None:
+        return None
+    try:
+        with open(f"/proc/self/task/{native_id}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _rss_mb() -> float | None:
+    try:
+        import psutil  # type: ignore
+
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _gpu_mb() -> dict[str, float]:
+    """Память GPU: torch (если уже загружен и CUDA поднята) и занятое по nvidia-smi."""
+    out: dict[str, float] = {}
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        try:
+            if torch.cuda.is_initialized():
+                out["torch_allocated_mb"] = torch.cuda.memory_allocated() / 2**20
+                out["torch_reserved_mb"] = torch.cuda.memory_reserved() / 2**20
+        except Exception:  # pragma: no cover - зависит от сборки torch
+            pass
+    if shutil.which("nvidia-smi"):
+        try:
+            res = subprocess.run(
+                ["nvidia-smi", "--query-gpu=memory.used", "--format=csv,noheader,nounits"],
+                capture_output=True, text=True, timeout=2, check=True,
+            )
+            out["gpu_used_mb"] = float(sum(int(x) for x in res.stdout.split()))
+        except (OSError, subprocess.SubprocessError, ValueError):
+            pass
+    return out
+
+
+class _Categorizer:
+    """Стек tracemalloc -> категория по ALLOC_CATEGORIES (с кэшем по файлу и строке)."""
+
+    def __init__(self, rules=ALLOC_CATEGORIES):
+        self.rules = rules
+        self._cache: dict[tuple[str, int], str | None] = {}
+        self._ranges: dict[tuple[str, str], tuple[int, int] | None] = {}
+
+    def _func_range(self, filename: str, func: str) -> tuple[int, int] | None:
+        key = (filename, func)
+        if key not in self._ranges:
+            rng = None
+            for mod in list(sys.modules.values()):
+                if _norm(getattr(mod, "__file__", None) or "") == filename and hasattr(mod, func):
+                    try:
+                        lines, start = inspect.getsourcelines(getattr(mod, func))
+                        rng = (start, start + len(lines) - 1)
+                    except (OSError, TypeError):
+                        pass
+                    break
+            self._ranges[key] = rng
+        return self._ranges[key]
+
+    def _match(self, filename: str, lineno: int) -> str | None:
+        key = (filename, lineno)
+        if key not in self._cache:
+            cat = None
+            for name, part, func in self.rules:
+                if part not in filename:
+                    continue
+                if func is not None:
+                    rng = self._func_range(filename, func)
+                    if rng is None or not rng[0] <= lineno <= rng[1]:
+                        continue
+                cat = name
+                break
+            self._cache[key] = cat
+        return self._cache[key]
+
+    def category(self, traceback) -> str:
+        # кадры Traceback идут от внешнего к внутреннему — смотрим с самого внутреннего
+        for frame in reversed(traceback):
+            cat = self._match(_norm(frame.filename), frame.lineno)
+            if cat is not None:
+                return cat
+        return "other"
+
+
+class Profiler:
+    """
+    Сэмплирующий профайлер стадий + снимки памяти. start() — до создания конвейера
+    (чтобы попала и загрузка моделей), stop() + write() — при завершении.
+    """
+
+    def __init__(self, log_dir: str, interval_ms: int = 10, mem_interval_s: float = 5.0,
+                 top_n: int = 25, trace_frames: int = 8):
+        self.log_dir = log_dir
+        self.interval = max(interval_ms, 1) / 1000.0
+        self.mem_interval = max(mem_interval_s, 0.1)
+        self.top_n = top_n
+        self.trace_frames = trace_frames
+        self.samples = 0
+        self.t0 = 0.0
+        self.wall_s = 0.0
+        self.stacks: collections.Counter = collections.Counter()      # (stage, frames...) -> сэмплы
+        self.stage_samples: collections.Counter = collections.Counter()
+        self.stage_idle: collections.Counter = collections.Counter()
+        self.thread_cpu: dict[tuple[str, int], tuple[str, float]] = {}  # (имя, ident) -> (стадия, CPU с)
+        self.memory: list[dict] = []
+        self._categorizer = _Categorizer()
+        self._first_snapshot: tracemalloc.Snapshot | None = None
+        self._last_snapshot: tracemalloc.Snapshot | None = None
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    # --------------------------- Запуск / остановка ---------------------------
+
+    def start(self):
+        """Сэмплы стеков и RSS/GPU — сразу; аллокации — после start_tracing()."""
+        self.t0 = time.perf_counter()
+        self._threads = [
+            threading.Thread(target=self._sample_loop, daemon=True, name="profiler"),
+            threading.Thread(target=self._memory_loop, daemon=True, name="profiler_mem"),
+        ]
+        for t in self._threads:
+            t.start()
+        logger.info("Профилирование включено: сэмплы раз в %.0f мс, память раз в %.1f с",
+                    self.interval * 1000, self.mem_interval)
+
+    def start_tracing(self):
+        """
+        Включить tracemalloc. Вызывается, когда модели загружены: трассировка импортов
+        и загрузки весов замедляет старт в разы, а интересны аллокации рабочего цикла.
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        self._take_memory()
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout=5.0)
+        self._take_memory()
+        self._update_cpu()
+        tracemalloc.stop()
+        self.wall_s = time.perf_counter() - self.t0
+
+    # --------------------------- Сэмплирование ---------------------------
+
+    def _sample_loop(self):
+        own = {threading.get_ident()}
+        n = 0
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            own.update(t.ident for t in self._threads)
+            for ident, frame in sys._current_frames().items():
+                if ident in own:
+                    continue
+                stage = stage_of(names.get(ident, f"thread-{ident}"))
+                leaf = frame.f_code
+                self.stage_samples[stage] += 1
+                if (os.path.basename(leaf.co_filename), leaf.co_name) in _IDLE:
+                    self.stage_idle[stage] += 1
+                    continue
+                labels = []
+                f = frame
+                while f is not None:
+                    labels.append(_frame_label(f.f_code))
+                    f = f.f_back
+                self.stacks[(stage, *reversed(labels))] += 1
+            self.samples += 1
+            n += 1
+            if n % 100 == 0:
+                self._update_cpu()
+
+    def _update_cpu(self):
+        for t in threading.enumerate():
+            cpu = _thread_cpu_s(getattr(t, "native_id", None))
+            if cpu is not None:
+                self.thread_cpu[(t.name, t.ident)] = (stage_of(t.name), cpu)
+
+    # --------------------------- Память ---------------------------
+
+    def _memory_loop(self):
+        self._take_memory()
+        while not self._stop.wait(self.mem_interval):
+            self._take_memory()
+
+    def _take_memory(self):
+        rec = {"t": round(time.perf_counter() - self.t0, 2), "rss_mb": _rss_mb(), **_gpu_mb()}
+        if not tracemalloc.is_tracing():
+            self.memory.append(rec)
+            return
+        # собственные структуры профайлера в отчёт не попадают
+        snap = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__, all_frames=True),
+        ])
+        if self._first_snapshot is None:
+            self._first_snapshot = snap
+        self._last_snapshot = snap
+        by_cat: dict[str, int] = collections.defaultdict(int)
+        for stat in snap.statistics("traceback"):
+            by_cat[self._categorizer.category(stat.traceback)] += stat.size
+        traced, peak = tracemalloc.get_traced_memory()
+        self.memory.append({
+            **rec,
+            "traced_mb": round(traced / 2**20, 2),
+            "traced_peak_mb": round(peak / 2**20, 2),
+            "categories_kb": {k: v // 1024 for k, v in sorted(by_cat.items(), key=lambda kv: -kv[1])},
+        })
+
+    # --------------------------- Отчёт ---------------------------
+
+    def write(self, session_prefix: str) -> list[str]:
+        """Записать стеки, ряд памяти и сводку в log_dir; вернуть пути файлов."""
+        os.makedirs(self.log_dir, exist_ok=True)
+        base = os.path.join(self.log_dir, session_prefix)
+        paths = [f"{base}_profile_stacks.txt", f"{base}_profile_memory.jsonl", f"{base}_profile_summary.txt"]
+
+        with open(paths[0], "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(";".join(stack) + f" {n}\n")
+        with open(paths[1], "w", encoding="utf-8") as f:
+            for rec in self.memory:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+        with open(paths[2], "w", encoding="utf-8") as f:
+            f.write(self.summary())
+        return paths
+
+    def summary(self) -> str:
+        n = self.top_n
+        out = [f"Профиль: {self.wall_s:.1f} с, {self.samples} сэмплов по {self.interval * 1000:.0f} мс", ""]
+
+        cpu_by_stage: dict[str, float] = collections.defaultdict(float)
+        for stage, cpu in self.thread_cpu.values():
+            cpu_by_stage[stage] += cpu
+        out.append("Стадии (сэмплы: всего / простой / работа; CPU из /proc):")
+        for stage, total in self.stage_samples.most_common():
+            idle = self.stage_idle[stage]
+            cpu = f"{cpu_by_stage[stage]:.2f} с" if stage in cpu_by_stage else "—"
+            out.append(f"  {stage:14s} {total:7d} / {idle:7d} / {total - idle:7d}   CPU {cpu}")
+
+        self_t: dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+        cum_t: dict[str, collections.Counter] = collections.defaultdict(collections.Counter)
+        for (stage, *frames), cnt in self.stacks.items():
+            self_t[stage][frames[-1]] += cnt
+            for label in set(frames):
+                cum_t[stage][label] += cnt
+        for stage in sorted(self_t):
+            out += ["", f"[{stage}] топ-{n} по собственному времени (сэмплы):"]
+            out += [f"  {c:7d}  {label}" for label, c in self_t[stage].most_common(n)]
+            out += [f"[{stage}] топ-{n} по включительному времени (сэмплы):"]
+            out += [f"  {c:7d}  {label}" for label, c in cum_t[stage].most_common(n)]
+
+        if self.memory:
+            rss = [m["rss_mb"] for m in self.memory if m.get("rss_mb") is not None]
+            last = self.memory[-1]
+            out += ["", "Память:"]
+            if rss:
+                out.append(f"  RSS: старт {rss[0]:.0f} МБ, пик {max(rss):.0f} МБ, конец {rss[-1]:.0f} МБ")
+            for key in ("gpu_used_mb", "torch_allocated_mb", "torch_reserved_mb"):
+                vals = [m[key] for m in self.memory if key in m]
+                if vals:
+                    out.append(f"  {key}: пик {max(vals):.0f}, конец {vals[-1]:.0f}")
+            if "traced_mb" in last:
+                out.append(f"  tracemalloc: {last['traced_mb']} МБ, пик {last['traced_peak_mb']} МБ")
+                out.append("  По категориям (последний снимок, КБ):")
+                out += [f"    {k:14s} {v:10d}" for k, v in list(last["categories_kb"].items())[:n]]
+
+        if self._last_snapshot is not None:
+            out += ["", f"Топ-{n} строк по объёму живых аллокаций:"]
+            for stat in self._last_snapshot.statistics("lineno")[:n]:
+                fr = stat.traceback[0]
+                out.append(f"  {stat.size / 1024:10.1f} КБ  {stat.count:7d} шт  {_norm(fr.filename)}:{fr.lineno}")
+            if self._first_snapshot is not None and self._first_snapshot is not self._last_snapshot:
+                out += ["", f"Топ-{n} строк по росту с первого снимка:"]
+                diff = self._last_snapshot.compare_to(self._first_snapshot, "lineno")
+                for stat in diff[:n]:
+                    fr = stat.traceback[0]
+                    out.append(f"  {stat.size_diff / 1024:+10.1f} КБ  {_norm(fr.filename)}:{fr.lineno}")
+        return "\n".join(out) + "\n"
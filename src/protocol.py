@@ -0,0 +1,53 @@
+"""
+Протокол локального сервера перевода (TCP, localhost).
+
+Кадр: 1 байт типа + 4 байта длины (big-endian) + полезная нагрузка.
+
+Клиент -> сервер:
+  H  JSON {"sample_rate": 16000, "dir": "auto|ru-en|en-ru", "src_lang": "auto|ru|en", "tts": true}
+  A  аудио: float32 little-endian, моно, sample_rate из H
+  E  конец потока (сервер доработает очередь и ответит B)
+
+Сервер -> клиент:
+  T  JSON фрагмента: fragment_id, src_lang, dir, asr_text, mt_text, in_end (сэмпл конца сегмента
+     во входном потоке), timings, audio_samples (сколько сэмплов в следующем кадре W; 0 — без звука)
+  W  TTS-аудио фрагмента: float32 little-endian, моно
+  B  JSON итоговой статистики сессии, после него соединение закрывается
+  X  JSON {"error": "..."} — ошибка, соединение закрывается
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import struct
+
+import numpy as np
+
+HELLO, AUDIO, END = b"H", b"A", b"E"
+TEXT, WAVE, BYE, ERROR = b"T", b"W", b"B", b"X"
+
+_HDR = struct.Struct(">cI")
+MAX_FRAME = 64 * 1024 * 1024
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[bytes, bytes]:
+    kind, n = _HDR.unpack(await reader.readexactly(_HDR.size))
+    if n > MAX_FRAME:
+        raise ValueError(f"frame too large: {n}")
+    return kind, await reader.readexactly(n)
+
+
+def pack_frame(kind: bytes, payload: bytes) -> bytes:
+    return _HDR.pack(kind, len(payload)) + payload
+
+
+def pack_json(kind: bytes, obj) -> bytes:
+    return pack_frame(kind, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+
+def pack_audio(kind: bytes, wav: np.ndarray) -> bytes:
+    return pack_frame(kind, np.asarray(wav, dtype="<f4").tobytes())
+
+
+def unpack_audio(payload: bytes) -> np.ndarray:
+    return np.frombuffer(payload, dtype="<f4").astype("float32")
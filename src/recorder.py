@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import threading
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class SessionRecorder:
+    """
+    Запись сессии на диск из фонового потока:
+      {prefix}_input.wav  — сырой поток с микрофона/WAV (float32, как пришёл в VAD);
+      {prefix}_tts.wav    — все синтезированные фразы подряд;
+      {prefix}_index.jsonl — соответствие fragment_id -> смещения (в сэмплах) в обоих файлах.
+
+    Горячие потоки только кладут блоки в ограниченную очередь (put_nowait);
+    при переполнении блок отбрасывается и учитывается в dropped_*.
+    Потерянные входные блоки заменяются тишиной той же длины, чтобы
+    смещения в индексе совпадали с исходным потоком.
+
+    Запись input.wav можно проиграть обратно через WavStream (--mode wav) с тем же chunk_ms —
+    блоки совпадут один в один, что делает прогон детерминированным.
+    """
+
+    def __init__(self, log_dir: str, session_prefix: str, sr: int, block_ms: int,
+                 save_input: bool = True, save_tts: bool = True, max_blocks: int = 256,
+                 channels: int = 1):
+        self.sr = sr
+        self.channels = channels  # каналов во входе (многоканальный режим пишет все)
+        self.save_input = save_input
+        self.save_tts = save_tts
+        os.makedirs(log_dir, exist_ok=True)
+
+        base = os.path.join(log_dir, session_prefix)
+        self.input_path = f"{base}_input.wav" if save_input else None
+        self.tts_path = f"{base}_tts.wav" if save_tts else None
+        self.index_path = f"{base}_index.jsonl"
+
+        self.dropped_input = 0
+        self.dropped_tts = 0
+        self.dropped_index = 0  # записи индекса: без них смещения в индексе не сходятся со звуком
+        self._lock = threading.Lock()  # счётчики потерь меняют потоки захвата, ASR и TTS
+        self._in_gap = 0  # сэмплы входа, потерянные с момента последней успешной постановки
+
+        import soundfile as sf  # лениво: рекордер включается только по конфигу
+
+        self._q: queue.Queue = queue.Queue(maxsize=max(max_blocks, 1))
+        self._f_in = sf.SoundFile(self.input_path, "w", samplerate=sr, channels=channels,
+                                  subtype="FLOAT") if save_input else None
+        self._f_tts = sf.SoundFile(self.tts_path, "w", samplerate=sr, channels=1,
+                                   subtype="FLOAT") if save_tts else None
+        self._f_idx = open(self.index_path, "w", encoding="utf-8")
+        self._n_tts = 0
+        self._write_index({"kind": "session", "sr": sr, "block_ms": block_ms, "channels": channels,
+                           "input": self.input_path, "tts": self.tts_path})
+
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True, name="recorder")
+        self._thread.start()
+
+    # --------------------------- Горячий путь ---------------------------
+
+    def push_input(self, block: np.ndarray):
+        """Очередной блок входного аудио (вызывается из потока захвата)."""
+        if self._f_in is None:
+            return
+        try:
+            self._q.put_nowait(("in", block, self._in_gap))
+            self._in_gap = 0
+        except queue.Full:
+            self._in_gap += len(block)
+            self._count("dropped_input")
+
+    def mark_input(self, fragment_id: str, offset: int, length: int):
+        """Отметить, какой кусок входа стал фрагментом (смещение в сэмплах входного потока)."""
+        self._put_meta({"kind": "input", "fragment_id": fragment_id,
+                        "offset": int(offset), "length": int(length)})
+
+    def push_tts(self, fragment_id: str, wav: np.ndarray):
+        """Синтезированная фраза; смещение в tts.wav вычисляет фоновый поток."""
+        if self._f_tts is None:
+            return
+        try:
+            self._q.put_nowait(("tts", wav, fragment_id))
+        except queue.Full:
+            self._count("dropped_tts")
+
+    def close(self, timeout: float = 2.0):
+        if not self._thread.is_alive():
+            return
+        try:
+            if self._f_in is not None and self._in_gap:
+                # хвост из потерянных блоков — дописываем тишиной, чтобы длина совпала
+                self._q.put(("in", np.zeros(0, dtype="float32"), self._in_gap), timeout=timeout)
+                self._in_gap = 0
+            self._q.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=timeout)
+        if self.dropped_input or self.dropped_tts or self.dropped_index:
+            logger.warning("Запись сессии: потеряно блоков входа=%d, фраз TTS=%d, записей индекса=%d",
+                           self.dropped_input, self.dropped_tts, self.dropped_index)
+
+    # --------------------------- Внутреннее ---------------------------
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _put_meta(self, rec: dict):
+        try:
+            self._q.put_nowait(("meta", rec, None))
+        except queue.Full:
+            self._count("dropped_index")
+
+    def _write_index(self, rec: dict):
+        self._f_idx.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def _writer_loop(self):
+        while True:
+            item = self._q.get()
+            if item is _STOP:
+                break
+            kind, payload, extra = item
+            try:
+                if kind == "in":
+                    shape = (-1,) if self.channels == 1 else (-1, self.channels)
+                    if extra:
+                        self._f_in.write(np.zeros(extra * self.channels, dtype="float32").reshape(shape))
+                    self._f_in.write(np.asarray(payload, dtype="float32").reshape(shape))
+                elif kind == "tts":
+                    wav = np.asarray(payload, dtype="float32").reshape(-1)
+                    self._f_tts.write(wav)
+                    self._write_index({"kind": "tts", "fragment_id": extra,
+                                       "offset": self._n_tts, "length": len(wav)})
+                    self._n_tts += len(wav)
+                else:
+                    self._write_index(payload)
+            except Exception as exc:  # запись не должна ронять конвейер
+                logger.debug("Ошибка записи сессии: %s", exc)
+
+        for f in (self._f_in, self._f_tts, self._f_idx):
+            if f is not None:
+                try:
+                    f.close()
+                except Exception:
+                    pass
+
+
+def load_index(path: str) -> dict[str, dict]:
+    """
+    Прочитать {prefix}_index.jsonl: fragment_id -> {"input": (offset, length), "tts": (offset, length)}.
+    Служебная запись сессии доступна под ключом "__session__".
+    """
+    out: dict[str, dict] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            if rec.get("kind") == "session":
+                out["__session__"] = rec
+                continue
+            entry = out.setdefault(rec["fragment_id"], {})
+            entry[rec["kind"]] = (rec["offset"], rec["length"])
+    return out
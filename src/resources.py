@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import logging
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+
+logger = logging.getLogger(__name__)
+
+# Доли бюджета по умолчанию: ASR (Whisper) — самый тяжёлый, Piper — самый лёгкий
+_DEFAULT_WEIGHTS = {"asr": 3, "mt": 2, "tts": 1}
+
+
+@dataclass
+class ThreadPlan:
+    """Раскладка потоков CPU между компонентами (и, опционально, ядер для привязки стадий)."""
+    total: int
+    asr_threads: int
+    asr_workers: int
+    mt_threads: int
+    mt_interop: int
+    tts_threads: int  # доля бюджета под Piper: число ядер для привязки, не лимит потоков ORT
+    # стадия -> список ядер для привязки; пусто — без привязки
+    cpus: dict[str, list[int]] = field(default_factory=dict)
+
+    def describe(self) -> str:
+        s = (f"бюджет={self.total}: asr cpu_threads={self.asr_threads} num_workers={self.asr_workers}; "
+             f"mt threads={self.mt_threads} interop={self.mt_interop}; "
+             f"tts доля={self.tts_threads} (потоки Piper не ограничиваются)")
+        if self.cpus:
+            s += "; привязка " + ", ".join(f"{k}={v}" for k, v in self.cpus.items())
+        return s
+
+
+def _available_cpus() -> list[int]:
+    if hasattr(os, "sched_getaffinity"):
+        try:
+            return sorted(os.sched_getaffinity(0))
+        except OSError:  # pragma: no cover - зависит от платформы
+            pass
+    return list(range(os.cpu_count() or 1))
+
+
+def _split(total: int, weights: dict[str, int]) -> dict[str, int]:
+    """Поделить total пропорционально весам (метод наибольших остатков), минимум 1 на компонент."""
+    wsum = sum(weights.values()) or 1
+    raw = {k: total * w / wsum for k, w in weights.items()}
+    out = {k: int(v) for k, v in raw.items()}
+    rest = total - sum(out.values())
+    for k in sorted(raw, key=lambda k: raw[k] - out[k], reverse=True)[:max(rest, 0)]:
+        out[k] += 1
+    return {k: max(v, 1) for k, v in out.items()}
+
+
+def plan_threads(resources_cfg, cpus: list[int] | None = None) -> ThreadPlan:
+    """
+    Разделить resources.threads между ASR, MT и TTS.
+
+    resources.threads_split (если задан) фиксирует числа явно, иначе бюджет делится
+    по весам asr:mt:tts = 3:2:1. При бюджете меньше числа компонентов каждый получает
+    по одному потоку (перекрытие неизбежно). num_workers у Whisper берётся из
+    resources.asr_workers отдельно: это число параллельных запросов, а не потоков
+    одного запроса. При resources.pin_threads каждой стадии выдаётся
+    непересекающийся диапазон ядер (по кругу, если ядер меньше бюджета).
+    """
+    cpus = cpus if cpus is not None else _available_cpus()
+    total = max(int(getattr(resources_cfg, "threads", 0) or len(cpus)), 1)
+
+    explicit = getattr(resources_cfg, "threads_split", None) or {}
+    split = _split(total, _DEFAULT_WEIGHTS)
+    split.update({k: max(int(v), 1) for k, v in explicit.items() if k in _DEFAULT_WEIGHTS})
+
+    pinned: dict[str, list[int]] = {}
+    if getattr(resources_cfg, "pin_threads", False) and cpus:
+        i = 0
+        for stage in ("asr", "mt", "tts"):
+            pinned[stage] = sorted({cpus[(i + j) % len(cpus)] for j in range(split[stage])})
+            i += split[stage]
+
+    return ThreadPlan(
+        total=total,
+        asr_threads=split["asr"],
+        asr_workers=max(int(getattr(resources_cfg, "asr_workers", 1)), 1),
+        mt_threads=split["mt"],
+        mt_interop=1,  # Marian декодируем по одной фразе — межоперационный параллелизм не нужен
+        tts_threads=split["tts"],
+        cpus=pinned,
+    )
+
+
+def pin_current_thread(cpus: list[int], stage: str) -> bool:
+    """
+    Привязать текущий поток к ядрам.
+    Linux: sched_setaffinity(0) действует на вызывающий поток; Windows: SetThreadAffinityMask.
+    На прочих платформах — тихо ничего не делает.
+    """
+    if not cpus:
+        return False
+    if os.name == "nt":
+        try:
+            import ctypes
+            k32 = ctypes.windll.kernel32  # type: ignore[attr-defined]
+            mask = sum(1 << c for c in cpus)
+            if k32.SetThreadAffinityMask(k32.GetCurrentThread(), ctypes.c_size_t(mask)):
+                return True
+        except Exception as exc:  # pragma: no cover - зависит от платформы
+            logger.warning("Не удалось привязать стадию %s к ядрам %s: %s", stage, cpus, exc)
+        return False
+    if not hasattr(os, "sched_setaffinity"):
+        logger.debug("Привязка к ядрам недоступна на этой платформе (%s)", stage)
+        return False
+    try:
+        os.sched_setaffinity(0, cpus)
+    except OSError as exc:
+        logger.warning("Не удалось привязать стадию %s к ядрам %s: %s", stage, cpus, exc)
+        return False
+    return True
+
+
+_warned_inherit = False
+
+
+@contextmanager
+def pinned_thread(cpus: list[int], stage: str):
+    """
+    Привязать текущий поток к ядрам на время блока, затем вернуть привязку ко всем доступным.
+
+    Нужно при построении моделей: ctranslate2 (Whisper, NLLB) создаёт рабочие потоки
+    при загрузке, и они наследуют привязку потока загрузки, а не того, что потом вызывает модель.
+    Так только в Linux: в Windows новый поток получает маску процесса, поэтому там привязка
+    потоков моделей не действует (маску процесса менять нельзя — загрузка идёт параллельно),
+    о чём один раз предупреждаем; к ядрам привязаны лишь потоки стадий конвейера.
+    """
+    if cpus and os.name == "nt":
+        global _warned_inherit
+        if not _warned_inherit:
+            _warned_inherit = True
+            logger.warning("resources.pin_threads: в Windows рабочие потоки ASR/MT не наследуют "
+                           "привязку потока загрузки — к ядрам привязаны только потоки стадий")
+        yield
+        return
+    prev = _available_cpus()
+    done = pin_current_thread(cpus, stage)
+    try:
+        yield
+    finally:
+        if done:
+            pin_current_thread(prev, stage)
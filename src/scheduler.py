@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+from .utils import Fragment
+
+
+@dataclass
+class SchedulerStats:
+    expired: int = 0   # пропущены: истёк дедлайн (устарели относительно живой речи)
+    merged: int = 0    # слиты с соседним фрагментом того же направления
+    dropped: int = 0   # вытеснены из переполненной очереди (самые старые)
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+def merge_fragments(frags: list[Fragment]) -> Fragment:
+    """Склеить подряд идущие фрагменты одного направления в один вызов MT/TTS."""
+    head, last = frags[0], frags[-1]
+    head.asr_text = " ".join(f.asr_text.strip() for f in frags if f.asr_text)
+    head.t_end = last.t_end
+    head.deadline = last.deadline
+    head.merged_ids = head.merged_ids + [f.fragment_id for f in frags[1:]]
+    if head.in_offset is not None and last.in_offset is not None and last.in_len is not None:
+        head.in_len = last.in_offset + last.in_len - head.in_offset
+    return head
+
+
+class FragmentScheduler:
+    """
+    Очередь ASR -> MT/TTS с учётом дедлайнов.
+
+    - put() никогда не блокирует: при переполнении вытесняется самый старый фрагмент
+      (новая речь важнее старой). Источник, который может подождать (файл), сверяется
+      с full() до put().
+    - get() пропускает фрагменты с истёкшим дедлайном, а хвост очереди одного
+      направления сливает с головным фрагментом (до merge_max_words слов) —
+      один вызов MT/TTS вместо нескольких, чтобы догнать живую речь.
+      Фрагменты разных каналов (дикторов) и уже переведённые куски инкрементального
+      режима не сливаются.
+    - on_discard(frag) вызывается (вне блокировки) для каждого вытесненного или
+      истёкшего фрагмента: так инкрементальный перевод узнаёт, что кусок не прозвучал.
+    """
+
+    def __init__(self, maxsize: int = 32, merge_max_words: int = 40, clock=time.perf_counter,
+                 on_discard=None):
+        self.maxsize = max(maxsize, 1)
+        self.merge_max_words = merge_max_words
+        self.clock = clock
+        self.on_discard = on_discard
+        self.stats = SchedulerStats()
+        self._q: deque[Fragment] = deque()
+        self._cv = threading.Condition()
+
+    def put(self, frag: Fragment):
+        evicted = []
+        with self._cv:
+            if len(self._q) >= self.maxsize:
+                evicted.append(self._q.popleft())
+                self.stats.dropped += 1
+            self._q.append(frag)
+            self._cv.notify()
+        self._discard(evicted)
+
+    def get(self, timeout: float | None = None) -> Fragment | None:
+        expired = []
+        try:
+            return self._get(timeout, expired)
+        finally:
+            self._discard(expired)
+
+    def _get(self, timeout: float | None, expired: list[Fragment]) -> Fragment | None:
+        with self._cv:
+            if not self._cv.wait_for(lambda: self._q, timeout):
+                return None
+            now = self.clock()
+            while self._q and self.is_expired(self._q[0], now):
+                expired.append(self._q.popleft())
+                self.stats.expired += 1
+            if not self._q:
+                return None
+
+            batch = [self._q.popleft()]
+            words = len(batch[0].asr_text.split())
+            while self._q and self.merge_max_words > 0:
+                nxt = self._q[0]
+                n = len(nxt.asr_text.split())
+                if (nxt.mt_dir != batch[0].mt_dir or nxt.channel != batch[0].channel
+                        or nxt.mt_text is not None or batch[0].mt_text is not None
+                        or words + n > self.merge_max_words):
+                    break
+                batch.append(self._q.popleft())
+                words += n
+            self.stats.merged += len(batch) - 1
+
+        return merge_fragments(batch) if len(batch) > 1 else batch[0]
+
+    def is_expired(self, frag: Fragment, now: float | None = None) -> bool:
+        if frag.deadline is None:
+            return False
+        return (self.clock() if now is None else now) > frag.deadline
+
+    def expire(self, frag: Fragment) -> bool:
+        """Проверка перед дорогой стадией (TTS): истёкший фрагмент учитывается и пропускается."""
+        if self.is_expired(frag):
+            with self._cv:
+                self.stats.expired += 1
+            self._discard([frag])
+            return True
+        return False
+
+    def _discard(self, frags: list[Fragment]):
+        if self.on_discard is not None:
+            for frag in frags:
+                self.on_discard(frag)
+
+    def note_expired(self):
+        """Учесть фрагмент, отброшенный по дедлайну ещё до постановки в очередь (до ASR)."""
+        with self._cv:
+            self.stats.expired += 1
+
+    def empty(self) -> bool:
+        with self._cv:
+            return not self._q
+
+    def full(self) -> bool:
+        with self._cv:
+            return len(self._q) >= self.maxsize
+
+    def __len__(self) -> int:
+        with self._cv:
+            return len(self._q)
+
+
+class FairQueue:
+    """
+    Очередь сегментов с честным обслуживанием нескольких источников (каналов).
+
+    У каждого ключа своя ограниченная очередь; get() обходит непустые ключи по кругу,
+    поэтому разговорчивый канал не может заморить общий ASR для остальных.
+    При переполнении ключа первым вытесняется самый старый «одноразовый» элемент
+    (disposable: префикс инкрементального режима, его заменит следующий), затем — самый
+    старый обычный; одноразовый элемент обычный не вытесняет и сам отбрасывается.
+    Вытеснение — для живого входа; источник, который может подождать, сверяется с full().
+    """
+
+    def __init__(self, maxsize_per_key: int = 8):
+        self.maxsize = max(maxsize_per_key, 1)
+        self.dropped = 0
+        self._qs: dict[object, deque] = {}
+        self._order: list[object] = []
+        self._next = 0
+        self._cv = threading.Condition()
+
+    def put(self, key, item, disposable: bool = False):
+        """Поставить item; вернуть вытесненный обычный элемент (None — никого или одноразовый)."""
+        evicted = None
+        with self._cv:
+            q = self._qs.get(key)
+            if q is None:
+                q = self._qs[key] = deque()
+                self._order.append(key)
+            if len(q) >= self.maxsize:
+                self.dropped += 1
+                victim = next((i for i, (_, d) in enumerate(q) if d), None)
+                if victim is None:
+                    if disposable:
+                        return None
+                    evicted = q.popleft()[0]
+                else:
+                    del q[victim]
+            q.append((item, disposable))
+            self._cv.notify()
+        return evicted
+
+    def get(self, timeout: float | None = None):
+        """Вернуть (key, item) следующего по кругу непустого ключа или None по таймауту."""
+        with self._cv:
+            if not self._cv.wait_for(lambda: any(self._qs.values()), timeout):
+                return None
+            n = len(self._order)
+            for i in range(n):
+                key = self._order[(self._next + i) % n]
+                if self._qs[key]:
+                    self._next = (self._next + i + 1) % n
+                    return key, self._qs[key].popleft()[0]
+        return None
+
+    def empty(self) -> bool:
+        with self._cv:
+            return not any(self._qs.values())
+
+    def full(self) -> bool:
+        """Заполнена ли очередь хотя бы одного ключа (следующий put() что-то вытеснит)."""
+        with self._cv:
+            return any(len(q) >= self.maxsize for q in self._qs.values())
@@ -0,0 +1,290 @@
+from __future__ import annotations
+import os as _os
+_os.environ.setdefault("ORT_DISABLE_CUDA", "1")
+_os.environ.setdefault("ORT_DISABLE_TENSORRT", "1")
+_os.environ.setdefault("ORT_DML_ENABLE", "0")
+
+import argparse
+import asyncio
+import collections
+import ipaddress
+import json
+import logging
+import time
+
+from .batching import BatchWorker
+from .config import Cfg
+from .logs import LogWriter
+from .protocol import (
+    AUDIO, BYE, END, ERROR, HELLO, TEXT, WAVE,
+    pack_audio, pack_json, read_frame, unpack_audio,
+)
+from .resources import plan_threads
+from .utils import Stopwatch, dir_from_lang, is_meaningful, new_fragment, prepare_tts_text
+from .vad import SimpleEnergyVAD
+
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationServer:
+    """
+    Локальный сервер перевода: модели грузятся один раз на процесс,
+    клиенты (по кабине на клиента) шлют аудио по TCP (см. src/protocol.py).
+
+    У каждого соединения свой VAD и своё состояние; запросы ASR/MT/TTS всех
+    сессий идут в общие BatchWorker-ы: MT переводит пачку фраз одного направления
+    одним generate. faster-whisper не умеет склеивать разные аудио в один батч,
+    поэтому пачка ASR обрабатывается одним потоком подряд — зато без конкуренции
+    сессий за ядра. Клиенту возвращаются текст (T) и, если просили, TTS-аудио (W).
+    """
+
+    def __init__(self, cfg, models=None):
+        self.cfg = cfg
+        self.sr = cfg.app.sample_rate
+        self.logger = LogWriter(
+            log_dir=cfg.logging.dir,
+            session_prefix=time.strftime("server_%Y%m%d_%H%M%S"),
+            flush_interval_ms=cfg.logging.flush_interval_ms,
+            flush_max_lines=cfg.logging.flush_max_lines,
+            jsonl=cfg.logging.jsonl,
+        )
+        if models is None:
+            from .models import load_for_config
+            plan = plan_threads(cfg.resources)
+            logger.info("Раскладка потоков: %s", plan.describe())
+            models = load_for_config(cfg, log=self.logger, plan=plan)
+        self.asr, self.mt, self.tts = models.asr, models.mt, models.tts
+
+        scfg = cfg.server
+        self.asr_worker = BatchWorker(self._asr_batch, scfg.asr_batch, scfg.batch_wait_ms, "asr_batch")
+        self.mt_worker = BatchWorker(self._mt_batch, scfg.mt_batch, scfg.batch_wait_ms, "mt_batch")
+        self.tts_worker = BatchWorker(self._tts_batch, 1, 0, "tts_batch")
+        self.sessions = 0
+
+    # --------------------------- Пакетные функции ---------------------------
+    # Сбой на одном запросе возвращается исключением на его месте (BatchWorker отдаст
+    # его только в Future этого запроса): остальные сессии пачки не страдают.
+
+    @staticmethod
+    def _each(fn, items):
+        out = []
+        for item in items:
+            try:
+                out.append(fn(*item))
+            except Exception as exc:
+                out.append(exc)
+        return out
+
+    def _asr_batch(self, items):
+        return self._each(lambda seg, lang: self.asr.transcribe_segment(seg, self.sr, language=lang), items)
+
+    def _mt_batch(self, items):
+        # items: (text, direction); группируем по направлению, порядок сохраняем
+        out: list = [None] * len(items)
+        by_dir: dict[str, list[int]] = collections.defaultdict(list)
+        for i, (_, direction) in enumerate(items):
+            by_dir[direction].append(i)
+        for direction, idx in by_dir.items():
+            try:
+                hyps = self.mt.translate_batch([items[i][0] for i in idx], direction)
+            except Exception as exc:
+                # пачка упала — переводим по одной, чтобы ошибка досталась только виновнику
+                logger.debug("mt_batch: пачка из %d упала (%s), перевод по одной", len(idx), exc)
+                hyps = self._each(lambda text, d: self.mt.translate_batch([text], d)[0],
+                                  [items[i] for i in idx])
+            for i, h in zip(idx, hyps):
+                out[i] = h
+        return out
+
+    def _tts_batch(self, items):
+        return self._each(self.tts.synth, items)
+
+    # --------------------------- Сессия ---------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.sessions += 1
+        sid = f"s{self.sessions}"
+        try:
+            kind, payload = await read_frame(reader)
+            if kind != HELLO:
+                raise ValueError("первым кадром ожидается H (hello)")
+            hello = json.loads(payload or b"{}")
+            if int(hello.get("sample_rate", self.sr)) != self.sr:
+                raise ValueError(f"ожидается sample_rate={self.sr}")
+            await self._session(sid, hello, reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            logger.info("Сессия %s: клиент отключился", sid)
+        except Exception as exc:
+            logger.warning("Сессия %s: %s", sid, exc)
+            try:
+                writer.write(pack_json(ERROR, {"error": str(exc)}))
+                await writer.drain()
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _session(self, sid: str, hello: dict, reader, writer):
+        fixed_dir = hello.get("dir", "auto")
+        src_lang = hello.get("src_lang", "auto")
+        want_tts = bool(hello.get("tts", True))
+        language = fixed_dir.split("-")[0] if fixed_dir != "auto" else (None if src_lang == "auto" else src_lang)
+
+        vad = SimpleEnergyVAD(
+            threshold=0.0008,
+            min_speech_ms=self.cfg.vad.min_speech_ms,
+            min_silence_ms=self.cfg.vad.min_silence_ms,
+            sr=self.sr,
+        )
+        stats = {"segments": 0, "fragments": 0, "dropped": 0, "failed": 0}
+        segments: collections.deque = collections.deque(maxlen=self.cfg.server.session_queue)
+        have_work = asyncio.Event()
+        done = False
+
+        async def process():
+            while True:
+                await have_work.wait()
+                if not segments:
+                    have_work.clear()
+                    if done:
+                        return
+                    continue
+                seg, in_end = segments.popleft()
+                # Сбой движка на одном сегменте не рвёт сессию: сегмент пропускается
+                try:
+                    await self._process_segment(sid, seg, in_end, fixed_dir, language, want_tts, writer, stats)
+                except ConnectionError:
+                    raise
+                except Exception as exc:
+                    stats["failed"] += 1
+                    logger.warning("Сессия %s: %s — сегмент пропущен", sid, exc)
+
+        async def read_audio():
+            n_in = 0
+            while True:
+                kind, payload = await read_frame(reader)
+                if kind == END:
+                    return
+                if kind != AUDIO:
+                    continue
+                block = unpack_audio(payload)
+                n_in += len(block)
+                seg = vad.push(block)
+                if seg is None:
+                    continue
+                stats["segments"] += 1
+                if len(segments) == segments.maxlen:
+                    stats["dropped"] += 1  # deque вытеснит самый старый сегмент
+                segments.append((seg, n_in))
+                have_work.set()
+
+        worker = asyncio.create_task(process())
+        reading = asyncio.create_task(read_audio())
+        # Обработчик упал (клиент отключился на отправке) — сразу перестаём принимать звук
+        worker.add_done_callback(lambda _: reading.cancel())
+        try:
+            await reading
+        except asyncio.CancelledError:
+            if not worker.done():
+                raise  # отменили саму сессию
+        finally:
+            reading.cancel()
+            done = True
+            have_work.set()
+            await worker  # ошибка обработчика (ConnectionError) уходит в handle()
+
+        writer.write(pack_json(BYE, stats))
+        await writer.drain()
+        logger.info("Сессия %s завершена: %s", sid, stats)
+
+    async def _process_segment(self, sid, seg, in_end, fixed_dir, language, want_tts, writer, stats):
+        sw = Stopwatch()
+        lang, text = await asyncio.wrap_future(self.asr_worker.submit((seg, language)))
+        asr_ms = sw.ms()
+        if not is_meaningful(text, min_len=3):
+            return
+        frag = new_fragment(0.0, len(seg) / self.sr, lang or "auto", text, dir_from_lang(lang, fixed_dir))
+        frag.timings["asr_ms"] = asr_ms
+        self.logger.log_asr(frag.fragment_id, frag.t_start, frag.t_end, frag.src_lang, text)
+
+        sw = Stopwatch()
+        hyp = await asyncio.wrap_future(self.mt_worker.submit((text, frag.mt_dir)))
+        frag.timings["mt_ms"] = sw.ms()
+        if not is_meaningful(hyp, min_len=2):
+            return
+        frag.mt_text = hyp
+
+        self.logger.log_mt(frag.fragment_id, frag.mt_dir, text, hyp)
+
+        wav = None
+        tts_text = prepare_tts_text(hyp) if want_tts else None
+        if tts_text is not None:
+            sw = Stopwatch()
+            out_lang = "en" if frag.mt_dir == "ru-en" else "ru"
+            wav = await asyncio.wrap_future(self.tts_worker.submit((tts_text, out_lang)))
+            frag.timings["tts_ms"] = sw.ms()
+
+        stats["fragments"] += 1
+        msg = {
+            "session": sid,
+            "fragment_id": frag.fragment_id,
+            "src_lang": frag.src_lang,
+            "dir": frag.mt_dir,
+            "asr_text": text,
+            "mt_text": hyp,
+            "in_end": in_end,
+            "timings": frag.timings,
+            "audio_samples": 0 if wav is None else len(wav),
+        }
+        self.logger.log_record("fragment", **msg)
+        writer.write(pack_json(TEXT, msg))
+        if wav is not None:
+            writer.write(pack_audio(WAVE, wav))
+        await writer.drain()
+
+    # --------------------------- Запуск ---------------------------
+
+    async def serve(self, host: str | None = None, port: int | None = None, ready: asyncio.Event | None = None):
+        host = host or self.cfg.server.host
+        port = self.cfg.server.port if port is None else port
+        try:
+            if not ipaddress.ip_address(host).is_loopback:
+                logger.warning("Сервер слушает не-loopback адрес %s — протокол без аутентификации", host)
+        except ValueError:
+            pass
+        server = await asyncio.start_server(self.handle, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        logger.info("Сервер перевода слушает %s:%d", host, self.port)
+        if ready is not None:
+            ready.set()
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        for w in (self.asr_worker, self.mt_worker, self.tts_worker):
+            w.close()
+        logger.info("Средний размер пачки: asr=%.2f mt=%.2f",
+                    self.asr_worker.avg_batch(), self.mt_worker.avg_batch())
+        self.logger.close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Локальный сервер перевода с общими моделями")
+    ap.add_argument('--config', required=True)
+    ap.add_argument('--host')
+    ap.add_argument('--port', type=int)
+    args = ap.parse_args()
+
+    cfg = Cfg.load(args.config)
+    logging.basicConfig(level=cfg.logging.level)
+    srv = TranslationServer(cfg)
+    try:
+        asyncio.run(srv.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.close()
+
+if __name__ == '__main__':
+    main()
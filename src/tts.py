@@ -1,10 +1,13 @@
 from __future__ import annotations
+import logging
 import os
 import sys
 import subprocess
 import tempfile
 import numpy as np
-import soundfile as sf
+
+
+logger = logging.getLogger(__name__)
 
 
 def _resample_linear(x: np.ndarray, sr_in: int, sr_out: int) -> np.ndarray:
@@ -28,11 +31,17 @@ def _is_ru_model(path: str) -> bool:
 
 class TTS:
     def __init__(self, engine: str, voice_ru: str, voice_en: str,
-                 use_gpu: bool, mock: bool, sr: int = 16000):
+                 use_gpu: bool, mock: bool, sr: int = 16000, log=None,
+                 cpus: list[int] | None = None):
         self.engine = engine
+        # Piper — отдельный процесс (CLI): число потоков ONNX Runtime снаружи не задать,
+        # поэтому ограничиваем только ядра — привязкой дочернего процесса (POSIX)
+        self.cpus = list(cpus or [])
+        self.log = log  # LogWriter (опционально) — диагностика Piper без блокировки на диске
         self.voice_ru = voice_ru
         self.voice_en = voice_en
         self.mock = mock
+        self.use_gpu = use_gpu  # Piper: --cuda (onnxruntime-gpu)
         self.target_sr = sr
 
         # Параметры Piper из ENV (pipeline прокидывает их из конфига)
@@ -44,6 +53,25 @@ class TTS:
         self.spk_ru = os.environ.get("PIPER_SPK_RU")  # напр. "0"
         self.spk_en = os.environ.get("PIPER_SPK_EN")
 
+    def _log_piper(self, text: str):
+        if self.log is not None:
+            self.log.log_piper(text)
+        else:
+            logger.warning("piper: %s", text.strip())
+
+    def _pin_child(self, pid: int):
+        """
+        Привязать запущенный Piper к ядрам стадии tts. Сразу после Popen: потоки ORT
+        создаются при загрузке модели и наследуют привязку. preexec_fn не используем —
+        он небезопасен в многопоточном процессе.
+        """
+        if not self.cpus or not hasattr(os, "sched_setaffinity"):
+            return
+        try:
+            os.sched_setaffinity(pid, self.cpus)
+        except OSError as exc:  # процесс мог уже завершиться
+            logger.debug("Не удалось привязать Piper к ядрам %s: %s", self.cpus, exc)
+
     def _normalize_model_path(self, p: str) -> str:
         # Если дали ...onnx.json — используем соседний .onnx
         if p.endswith(".onnx.json"):
@@ -75,25 +103,24 @@ class TTS:
             ]
             if speaker_id:
                 cmd += ["--speaker", str(speaker_id)]
+            if self.use_gpu:
+                cmd += ["--cuda"]
 
             creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
-            proc = subprocess.run(
+            proc = subprocess.Popen(
                 cmd,
-                check=False,
-                capture_output=True, text=True,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
                 creationflags=creationflags,
             )
+            self._pin_child(proc.pid)
+            out, err = proc.communicate()
 
             # Лог ошибок Piper — в файл
             if proc.returncode != 0:
-                try:
-                    os.makedirs("logs", exist_ok=True)
-                    with open(os.path.join("logs", "piper_stderr.txt"), "a", encoding="utf-8") as f:
-                        f.write((proc.stderr or proc.stdout or "") + "\n")
-                finally:
-                    pass
+                self._log_piper(err or out or "")
                 raise RuntimeError("Piper synthesis failed")
 
+            import soundfile as sf  # лениво: не нужен в mock-режиме
             wav, sr_in = sf.read(out_wav, dtype="float32", always_2d=False)
             if wav.ndim == 2:
                 wav = wav.mean(axis=1)
@@ -123,12 +150,7 @@ class TTS:
             spk = self.spk_ru
             # Подстраховка: предупредим в лог, если выбран не-ru голос для ru-текста
             if not _is_ru_model(model):
-                try:
-                    os.makedirs("logs", exist_ok=True)
-                    with open(os.path.join("logs", "piper_stderr.txt"), "a", encoding="utf-8") as f:
-                        f.write(f"Warning: RU text with non-RU model: {model}\n")
-                finally:
-                    pass
+                self._log_piper(f"Warning: RU text with non-RU model: {model}")
         else:
             model = self.voice_en
             spk = self.spk_en
@@ -1,7 +1,11 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import time
 import uuid
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
 
 @dataclass
 class Fragment:
@@ -12,6 +16,17 @@ class Fragment:
     asr_text: str
     mt_dir: str
     mt_text: str | None = None
+    timings: dict[str, int] = field(default_factory=dict)  # asr_ms / mt_ms / tts_ms ...
+    in_offset: int | None = None   # смещение сегмента во входном потоке, сэмплы
+    in_len: int | None = None
+    t_capture: float = 0.0           # perf_counter() конца захвата сегмента
+    deadline: float | None = None    # после этого момента фрагмент устарел (не озвучиваем)
+    merged_ids: list[str] = field(default_factory=list)  # id фрагментов, слитых в этот
+    channel: int = 0                 # входной канал (диктор) в многоканальном режиме
+    tts_text: str | None = None      # текст, ушедший в TTS (после санитайзера)
+    tts_audio: np.ndarray | None = None  # синтезированная речь (float32, app.sample_rate)
+    final: bool = True               # False — промежуточный кусок инкрементального перевода
+    stream_epoch: int | None = None  # номер гипотезы инкрементального перевода, к которой относится кусок
 
 class Stopwatch:
     def __init__(self):
@@ -57,3 +72,36 @@ def is_meaningful(text: str, min_len: int = 2) -> bool:
         return False
     return True
 
+
+def digits_ratio(s: str) -> float:
+    """Доля цифр и служебных символов в строке (1.0 для пустой)."""
+    n = len(s.strip())
+    if n == 0:
+        return 1.0
+    d = sum(ch.isdigit() for ch in s)
+    sym = sum(ch in "-_:.;,/#$%&*+=()[]{}" for ch in s)
+    return (d + sym) / n
+
+def prepare_tts_text(text: str) -> str | None:
+    """
+    Текст перевода -> текст для синтеза: санитайзер + жёсткая фильтрация
+    числового мусора. None — озвучивать нечего.
+    """
+    t = clean_for_tts(text)
+    if not is_meaningful(t, min_len=2):
+        return None
+    if digits_ratio(t) > 0.6:
+        return None
+    return t
+
+def dir_from_lang(lang: str | None, fixed: str = "auto") -> str:
+    """
+    Выбрать направление перевода:
+      - если задано явно (ru-en / en-ru), берём его;
+      - иначе отталкиваемся от языка ASR (ru* -> ru-en, иначе en-ru).
+    """
+    if fixed != "auto":
+        return fixed
+    if (lang or "").lower().startswith("ru"):
+        return "ru-en"
+    return "en-ru"
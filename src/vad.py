@@ -33,3 +33,13 @@ class SimpleEnergyVAD:
             else:
                 self.speech_buf = []
             return None
+
+    def pending_samples(self) -> int:
+        """Сколько сэмплов накоплено в незавершённом сегменте речи (0 — речи нет)."""
+        return sum(len(x) for x in self.speech_buf) if self.in_speech else 0
+
+    def partial(self) -> np.ndarray | None:
+        """Накопленная речь незавершённого сегмента (префикс для инкрементального режима)."""
+        if not self.in_speech or not self.speech_buf:
+            return None
+        return np.concatenate(self.speech_buf, axis=0)
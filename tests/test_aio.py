@@ -0,0 +1,108 @@
+import asyncio
+import tempfile
+import time
+
+import numpy as np
+
+from src.aio import AsyncPipeline, iterate_in_thread
+from src.config import Cfg
+from src.pipeline import Pipeline
+
+
+def _mock_pipeline(**asr_latency) -> Pipeline:
+    cfg = Cfg.load("configs/default.yaml")
+    cfg.logging.dir = tempfile.mkdtemp()
+    cfg.scheduling.max_lag_ms = 0
+    cfg.scheduling.merge_max_words = 0
+    if asr_latency:
+        cfg.resources.asr_workers = 3
+        cfg.mock.seed = 7
+        cfg.mock.asr = cfg.mock.asr.model_copy(update=asr_latency)
+    return Pipeline(cfg, audio_src=None)
+
+
+async def _speech(sr: int, phrases: int):
+    tone = 0.2 * np.sin(2 * np.pi * 220 * np.arange(sr) / sr).astype(np.float32)
+    audio = np.concatenate([tone, np.zeros(sr, dtype=np.float32)] * phrases)
+    for i in range(0, len(audio), sr // 2):
+        yield audio[i:i + sr // 2]
+
+
+def test_async_fragments_carry_text_and_audio():
+    p = _mock_pipeline()
+
+    async def run():
+        return [f async for f in AsyncPipeline(p).fragments(_speech(p.cfg.app.sample_rate, 3))]
+
+    frags = asyncio.run(run())
+    p.close()
+    assert len(frags) == 3
+    assert all(f.asr_text and f.mt_text and f.tts_audio is not None for f in frags)
+
+
+def test_slow_consumer_holds_back_translation():
+    p = _mock_pipeline()
+    translated = []
+    translate = p.translate
+    p.translate = lambda frag: translated.append(frag) or translate(frag)
+    apipe = AsyncPipeline(p, synth=False, max_pending=1)
+
+    async def run():
+        frags = apipe.fragments(_speech(p.cfg.app.sample_rate, 6))
+        await frags.__anext__()
+        await asyncio.sleep(0.3)  # потребитель «занят»: перевод не должен убегать вперёд
+        ahead = len(translated)
+        rest = [f async for f in frags]
+        return ahead, rest
+
+    ahead, rest = asyncio.run(run())
+    p.close()
+    assert ahead <= 3  # выданный + один в очереди + один, ждущий места
+    assert len(rest) == 5
+
+
+def test_fast_source_slow_consumer_loses_nothing():
+    p = _mock_pipeline()
+    p.q_segments.maxsize = 1
+    p.q_asr2mt.maxsize = 1
+
+    async def run():
+        frags = []
+        apipe = AsyncPipeline(p, synth=False, max_pending=1)
+        async for f in apipe.fragments(_speech(p.cfg.app.sample_rate, 8)):
+            await asyncio.sleep(0.05)  # потребитель медленнее источника
+            frags.append(f)
+        return frags
+
+    frags = asyncio.run(run())
+    p.close()
+    assert len(frags) == 8
+    assert p.stats()["segments_dropped"] == 0
+    assert p.stats()["dropped"] == 0
+
+
+def test_parallel_asr_keeps_speech_order():
+    # длинный хвост задержек ASR: при трёх воркерах поздний сегмент часто готов раньше
+    p = _mock_pipeline(dist="longtail", ms=30, sigma=1.5)
+
+    async def run():
+        apipe = AsyncPipeline(p, synth=False)
+        return [f async for f in apipe.fragments(_speech(p.cfg.app.sample_rate, 10))]
+
+    frags = asyncio.run(run())
+    p.close()
+    offsets = [f.in_offset for f in frags]
+    assert len(offsets) == 10
+    assert offsets == sorted(offsets)
+
+
+def test_blocks_are_stamped_in_source_thread():
+    async def run():
+        out = []
+        async for block, t in iterate_in_thread(iter(range(3)), stamp=True):
+            await asyncio.sleep(0.1)  # блоки ждут в буфере, пока потребитель занят
+            out.append((time.perf_counter(), t))
+        return out
+
+    seen = asyncio.run(run())
+    assert all(t_seen - t > 0.1 for t_seen, t in seen[1:])
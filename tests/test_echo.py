@@ -0,0 +1,61 @@
+import numpy as np
+
+from src.echo import EchoGate
+from src.playback import PlaybackMonitor
+from src.vad import SimpleEnergyVAD
+
+SR = 16000
+BLOCK = SR // 10  # 100 мс
+
+
+def _vad() -> SimpleEnergyVAD:
+    return SimpleEnergyVAD(threshold=0.0008, min_speech_ms=200, min_silence_ms=200, sr=SR)
+
+
+def _playing(wav: np.ndarray) -> tuple[PlaybackMonitor, float]:
+    """Монитор с одним интервалом воспроизведения длиной len(wav) / SR, начиная с t0."""
+    monitor = PlaybackMonitor()
+    return monitor, monitor.begin(wav, SR)
+
+
+def _tone(n: int = BLOCK) -> np.ndarray:
+    return 0.2 * np.sin(2 * np.pi * 220 * np.arange(n) / SR).astype(np.float32)
+
+
+def test_mute_mic_zeroes_overlapping_blocks_and_tail():
+    monitor, t0 = _playing(np.full(SR, 0.5, dtype=np.float32))  # играет [t0, t0 + 1 с]
+    gate = EchoGate("mute_mic", -20, monitor, _vad(), sr=SR, tail_ms=300)
+    mic = _tone()
+
+    assert not gate.process(mic, t0 + 0.5).any()   # во время воспроизведения
+    assert not gate.process(mic, t0 + 1.2).any()   # в хвосте 300 мс
+    assert np.array_equal(gate.process(mic, t0 + 1.5), mic)  # после хвоста
+    assert np.array_equal(gate.process(mic, t0), mic)         # до начала
+    assert gate.stats()["echo_gated_blocks"] == 2
+
+
+def test_ducking_only_above_env_floor():
+    wav = np.concatenate([np.full(SR // 2, 0.5), np.zeros(SR // 2)]).astype(np.float32)
+    monitor, t0 = _playing(wav)  # громко первые 0.5 с, дальше тишина
+    gate = EchoGate("ducking", -20, monitor, _vad(), sr=SR, tail_ms=0, env_floor=1e-3)
+    mic = _tone()
+
+    assert np.allclose(gate.process(mic, t0 + 0.3), mic * 0.1)
+    assert np.array_equal(gate.process(mic, t0 + 0.9), mic)  # окно внутри тишины выхода
+
+
+def test_asr_avoided_when_only_shadow_vad_emits():
+    monitor, t0 = _playing(np.full(SR, 0.5, dtype=np.float32))
+    gate = EchoGate("mute_mic", -20, monitor, _vad(), sr=SR, tail_ms=0)
+    main = _vad()
+    silence = np.zeros(BLOCK, dtype=np.float32)
+    emitted = []
+
+    # эхо: «речь» в микрофоне во время воспроизведения, затем тишина
+    for i, block in enumerate([_tone()] * 5 + [silence] * 3):
+        seg = main.push(gate.process(block, t0 + (i + 1) * BLOCK / SR))
+        gate.note_vad(seg is not None)
+        emitted.append(seg is not None)
+
+    assert not any(emitted)
+    assert gate.stats()["asr_avoided"] == 1
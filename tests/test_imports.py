@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Тяжёлые зависимости, которые не должны грузиться при разборе CLI/конфига
+HEAVY = ("sounddevice", "soundfile", "torch", "transformers", "ctranslate2",
+         "faster_whisper", "vosk", "argostranslate")
+
+# Бюджет на импорт src.app (микросекунды, cumulative из -X importtime); с запасом на медленный CI
+BUDGET_US = int(os.environ.get("IMPORT_BUDGET_US", "1500000"))
+
+
+def _importtime(code: str) -> dict[str, int]:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    out = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        out[name.strip()] = int(cumulative)
+    return out
+
+
+def test_app_import_is_light():
+    mods = _importtime("import src.app")
+    assert not [m for m in mods if m.split(".")[0] in HEAVY]
+    assert "src.profiling" not in mods  # профайлер — только по --profile
+    assert mods["src.app"] < BUDGET_US
+
+
+def test_config_and_mock_pipeline_skip_heavy_modules():
+    code = (
+        "import sys\n"
+        "from src.config import Cfg\n"
+        "from src.pipeline import Pipeline\n"
+        "cfg = Cfg.load('configs/default.yaml')\n"
+        "cfg.logging.dir = __import__('tempfile').mkdtemp()\n"
+        "p = Pipeline(cfg, audio_src=None)\n"
+        "p.wait_ready()\n"
+        "print(','.join(sorted(m for m in sys.modules if m.split('.')[0] in %r)))\n" % (HEAVY,)
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ""
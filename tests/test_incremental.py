@@ -0,0 +1,56 @@
+from src.incremental import CommitPolicy, IncrementalTranslator, align_prefix
+
+
+def test_commit_waits_for_stable_prefix_and_holds_back_k_words():
+    policy = CommitPolicy(wait_k=2)
+    assert policy.update("the weather") == ""                    # первая гипотеза — сравнить не с чем
+    assert policy.update("the weather today is") == "the weather"  # устоялось, хвост из 2 слов держим
+    assert policy.update("the weather today is very good") == "today is"
+    assert policy.finish("the weather today is very good indeed") == "very good indeed"
+    assert policy.final_text == "the weather today is very good indeed"
+    assert policy.committed == []
+
+
+def test_retokenized_prefix_is_aligned_and_divergence_resets():
+    assert align_prefix(["Don't", ",", "worry", "now"], ["do", "n't,"]) == 2
+    policy = CommitPolicy(wait_k=1)
+    policy.update("Hello , my friend")
+    assert policy.update("Hello , my friend is") == "Hello , my friend"
+    assert policy.update("Hello, my friend is here now") == "is"  # префикс детокенизирован иначе
+    assert policy.update("Goodbye friend is here now and") == ""  # MT ушёл от префикса
+    assert policy.committed == []
+
+
+
+class _PrefixMT:
+    def __init__(self):
+        self.prefixes = []
+
+    def translate_prefix(self, text, direction, prefix=""):
+        self.prefixes.append(prefix)
+        return text.upper()
+
+
+def test_translator_forces_committed_prefix_and_skips_stale_steps():
+    mt = _PrefixMT()
+    inc = IncrementalTranslator(wait_k=1)
+    assert inc.step(mt, "a b c", "ru-en", 100, final=False) == ""
+    assert inc.step(mt, "a b c d", "ru-en", 200, final=False) == "A B C"
+    assert inc.step(mt, "a b", "ru-en", 150, final=False) is None  # запоздавший префикс
+    assert inc.step(mt, "a b c d e", "ru-en", 300, final=True) == "D E"
+    assert mt.prefixes == ["", "", "A B C"]
+
+
+def test_unplayed_chunks_are_retracted():
+    mt = _PrefixMT()
+    inc = IncrementalTranslator(wait_k=1)
+    inc.step(mt, "a b", "ru-en", 100, final=False)
+    assert inc.step(mt, "a b c", "ru-en", 200, final=False) == "A B"
+    inc.retract("A B", inc.last_epoch)  # кусок истёк в очереди — не прозвучал
+    assert inc.policy.committed == []
+    assert inc.step(mt, "a b c d", "ru-en", 300, final=True) == "A B C D"
+    tail_epoch = inc.last_epoch
+    inc.retract("A B C D", tail_epoch - 1)  # чужая гипотеза — ничего не трогаем
+    assert inc.policy.final_text == "A B C D"
+    inc.retract("C D", tail_epoch)
+    assert inc.policy.final_text == "A B"
@@ -0,0 +1,33 @@
+import json
+import tempfile
+
+from src.logs import LogWriter
+
+
+def test_lines_and_jsonl_records_are_written_on_close():
+    w = LogWriter(tempfile.mkdtemp(), "s", flush_interval_ms=10_000, jsonl=True)
+    w.log_asr("f1", 0.0, 1.5, "ru", "привет")
+    w.log_mt("f1", "ru-en", "привет", "hello")
+    w.log_record("fragment", fragment_id="f1", asr_ms=12)
+    w.close()
+
+    with open(w.asr_path, encoding="utf-8") as f:
+        assert "id=f1" in f.read()
+    with open(w.mt_path, encoding="utf-8") as f:
+        assert "привет  =>  hello" in f.read()
+    with open(w.jsonl_path, encoding="utf-8") as f:
+        recs = [json.loads(line) for line in f]
+    assert [(r["kind"], r["fragment_id"], r["asr_ms"]) for r in recs] == [("fragment", "f1", 12)]
+    assert w.dropped == 0
+
+
+def test_write_error_counts_lost_lines_and_reopens_file():
+    w = LogWriter(tempfile.mkdtemp(), "s", flush_interval_ms=10_000, flush_max_lines=2)
+    w._files[w.asr_path].close()  # первая пачка упадёт на записи в закрытый файл
+    w.log_asr("f1", 0.0, 1.0, "ru", "раз")
+    w.log_asr("f2", 1.0, 2.0, "ru", "два")
+    w.log_asr("f3", 2.0, 3.0, "ru", "три")
+    w.close()
+    assert w.dropped == 2
+    with open(w.asr_path, encoding="utf-8") as f:
+        assert "id=f3" in f.read()
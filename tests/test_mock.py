@@ -0,0 +1,69 @@
+import tempfile
+import threading
+import time
+
+import pytest
+
+from src.config import Cfg, MockLatencyCfg
+from src.mock import Latency, MockFailure, SyntheticSpeech
+from src.pipeline import Pipeline
+
+
+def _cfg(**mock) -> Cfg:
+    cfg = Cfg.load("configs/default.yaml")
+    cfg.app.mode = "wav"
+    cfg.logging.dir = tempfile.mkdtemp()
+    cfg.mock.playback = "sleep"
+    cfg.mock.seed = 1
+    for stage, spec in mock.items():
+        setattr(cfg.mock, stage, MockLatencyCfg(**spec))
+    return cfg
+
+
+def _run(cfg, src) -> tuple[Pipeline, float]:
+    pipe = Pipeline(cfg, src)
+    pipe.player.speed = 0
+    t0 = time.perf_counter()
+    pipe.run()
+    return pipe, time.perf_counter() - t0
+
+
+def test_latency_distributions_and_failures():
+    assert Latency(MockLatencyCfg(ms=20, per_unit_ms=10)).sample(3) == pytest.approx(0.05)
+    normal = Latency(MockLatencyCfg(dist="normal", ms=10, jitter_ms=50), seed=0)
+    assert min(normal.sample() for _ in range(200)) == 0.0  # отрицательные обрезаются
+    tail = Latency(MockLatencyCfg(dist="longtail", ms=10, sigma=1.5), seed=0)
+    samples = sorted(tail.sample() for _ in range(500))
+    assert samples[-1] > 10 * samples[len(samples) // 2]
+    with pytest.raises(MockFailure):
+        Latency(MockLatencyCfg(fail_rate=1.0)).wait()
+
+
+def test_overload_expires_or_merges_instead_of_queueing():
+    cfg = _cfg(mt={"ms": 100})
+    cfg.app.mode = "mic"  # дедлайны и вытеснение — только для живого источника
+    cfg.scheduling.max_lag_ms = 300
+    src = SyntheticSpeech(cfg.app.sample_rate, cfg.app.chunk_ms, speech_ms=1000, silence_ms=500,
+                          duration_s=30, speed=0)
+    pipe, wall = _run(cfg, src)
+    stats = pipe.stats()
+    assert stats["expired"] + stats["merged"] > 0
+    assert wall < 10
+
+
+def test_engine_failures_skip_fragments_without_stopping():
+    cfg = _cfg(asr={"fail_rate": 0.5})
+    src = SyntheticSpeech(cfg.app.sample_rate, cfg.app.chunk_ms, speech_ms=1000, silence_ms=500,
+                          duration_s=15, speed=0)
+    pipe, _ = _run(cfg, src)
+    assert pipe.stats()["failed"] > 0
+
+
+def test_stop_shuts_down_endless_stream():
+    cfg = _cfg(asr={"ms": 50}, mt={"dist": "normal", "ms": 50, "jitter_ms": 20})
+    src = SyntheticSpeech(cfg.app.sample_rate, cfg.app.chunk_ms, duration_s=3600, speed=4)
+    pipe = Pipeline(cfg, src)
+    threading.Timer(1.0, pipe.stop.set).start()
+    t0 = time.perf_counter()
+    pipe.run()
+    assert time.perf_counter() - t0 < 5
@@ -1,2 +1,30 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+
 def test_imports():
     import src.app, src.pipeline, src.asr, src.mt, src.tts, src.vad, src.audio_in, src.playback, src.utils, src.config
+
+
+def test_missing_input_channel_is_a_config_error():
+    from src.audio_in import WavStream
+    from src.config import ChannelCfg, Cfg
+    from src.pipeline import Pipeline
+
+    cfg = Cfg.load("configs/default.yaml")
+    cfg.app.mode = "wav"
+    cfg.logging.dir = tempfile.mkdtemp()
+    cfg.app.channels = [ChannelCfg(index=0, dir="ru-en"), ChannelCfg(index=1, dir="en-ru")]
+    path = os.path.join(cfg.logging.dir, "mono.wav")
+    sf.write(path, np.zeros(16000, dtype=np.float32), 16000)
+
+    pipe = Pipeline(cfg, WavStream(path, 16000, 500, keep_channels=True))
+    with pytest.raises(ValueError, match="app.channels"):
+        pipe.run()
+    with pytest.raises(ValueError, match="app.channels"):
+        pipe.feed(np.zeros((8000, 1), dtype=np.float32), 8000, 0.0)
+    pipe.close()
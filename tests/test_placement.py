@@ -0,0 +1,67 @@
+from src.config import Cfg
+from src.placement import DeviceInventory, estimate_footprint_mb, plan_placement
+
+
+def _cfg(**resources):
+    cfg = Cfg()
+    cfg.asr.model_path = "models/whisper-medium-ct2"
+    cfg.mt.engine = "marian"
+    cfg.mt.model_path = "models/marian-ru-en"
+    cfg.mt.model_path_back = "models/marian-en-ru"
+    cfg.tts.engine = "piper"
+    for k, v in resources.items():
+        setattr(cfg.resources, k, v)
+    return cfg
+
+
+def test_cpu_only_machine():
+    pl = plan_placement(_cfg(), DeviceInventory(cuda_devices=0, ram_mb=16000))
+    assert {p.device for p in pl.values()} == {"cpu"}
+    assert pl["asr"].compute_type == "int8"
+    assert pl["mt"].compute_type == "float32"
+
+
+def test_everything_fits_on_gpu():
+    pl = plan_placement(_cfg(), DeviceInventory(cuda_devices=1, vram_mb=24000, ram_mb=32000))
+    assert pl["asr"].device == pl["mt"].device == "cuda"
+    assert pl["asr"].compute_type == "float16"
+
+
+def test_vram_budget_pushes_mt_to_cpu():
+    cfg = _cfg(vram_budget_mb=2200)
+    pl = plan_placement(cfg, DeviceInventory(cuda_devices=1, vram_mb=8000, ram_mb=32000))
+    assert pl["asr"].device == "cuda"
+    assert pl["asr"].est_mb <= 2200
+    assert pl["mt"].device == "cpu"
+
+
+def test_compact_compute_type_when_float16_does_not_fit():
+    full = estimate_footprint_mb("faster-whisper", ["models/whisper-medium-ct2"], "float16")
+    pl = plan_placement(_cfg(vram_budget_mb=full - 1), DeviceInventory(cuda_devices=1, vram_mb=8000))
+    assert pl["asr"].device == "cuda"
+    assert pl["asr"].compute_type == "int8_float16"
+
+
+def test_explicit_devices_and_use_gpu_false():
+    cfg = _cfg(use_gpu=False)
+    cfg.asr.device = "cuda"
+    cfg.mt.compute_type = "int8"
+    pl = plan_placement(cfg, DeviceInventory(cuda_devices=1, vram_mb=8000))
+    assert pl["asr"].device == "cuda"
+    assert (pl["mt"].device, pl["mt"].compute_type) == ("cpu", "int8")
+    assert pl["tts"].device == "cpu"
+
+
+def test_cuda_requested_without_gpu_falls_back():
+    cfg = _cfg()
+    cfg.asr.device = "cuda"
+    pl = plan_placement(cfg, DeviceInventory())
+    assert (pl["asr"].device, pl["asr"].compute_type) == ("cpu", "int8")
+
+
+def test_use_gpu_true_forces_auto_components_onto_gpu():
+    cfg = _cfg(use_gpu=True, vram_budget_mb=100)
+    pl = plan_placement(cfg, DeviceInventory(cuda_devices=1, vram_mb=8000))
+    assert pl["asr"].device == pl["mt"].device == "cuda"
+    assert pl["tts"].device == "cpu"  # tts.device по умолчанию cpu: --cuda у Piper только явно
+    assert plan_placement(cfg, DeviceInventory())["asr"].device == "cpu"
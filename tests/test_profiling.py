@@ -0,0 +1,41 @@
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from src.profiling import Profiler, stage_of
+from src.vad import SimpleEnergyVAD
+
+
+def test_profiler_attributes_stages_and_allocations():
+    out = tempfile.mkdtemp()
+    prof = Profiler(out, interval_ms=5, mem_interval_s=0.1)
+    prof.start()
+    prof.start_tracing()
+
+    vad = SimpleEnergyVAD(threshold=1e-4, min_speech_ms=100, min_silence_ms=10_000)
+    block = np.full(1600, 0.1, dtype=np.float32)
+
+    def asr_like():
+        t_end = time.perf_counter() + 0.3
+        while time.perf_counter() < t_end:
+            sum(i * i for i in range(1000))
+
+    worker = threading.Thread(target=asr_like, name="asr_0")
+    worker.start()
+    for _ in range(200):
+        vad.push(block)
+    held = vad.partial()  # склейка незавершённого сегмента — аллокация в vad.py
+    worker.join()
+    time.sleep(0.2)
+    prof.stop()
+
+    paths = prof.write("session_test")
+    assert all(os.path.getsize(p) > 0 for p in paths)
+    assert prof.stage_samples["asr"] > prof.stage_idle["asr"]
+    assert any(stack[0] == "asr" for stack in prof.stacks)
+    last = [m for m in prof.memory if "categories_kb" in m][-1]
+    assert last["categories_kb"].get("vad_buffer", 0) >= held.nbytes // 1024
+    assert stage_of("mt_0") == "mt" and stage_of("MainThread") == "loop"
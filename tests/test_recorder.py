@@ -0,0 +1,78 @@
+import os
+import queue
+import tempfile
+
+import numpy as np
+import soundfile as sf
+
+from src.audio_in import WavStream
+from src.config import Cfg
+from src.mock import SyntheticSpeech
+from src.pipeline import Pipeline
+from src.recorder import SessionRecorder, load_index
+
+
+def _record(src) -> Pipeline:
+    cfg = Cfg.load("configs/default.yaml")
+    cfg.app.mode = "wav"
+    cfg.logging.dir = tempfile.mkdtemp()
+    cfg.logging.save_input_wav = True
+    cfg.logging.save_tts_wav = True
+    cfg.mock.playback = "sleep"
+    pipe = Pipeline(cfg, src)
+    pipe.player.speed = 0
+    pipe.run()
+    return pipe
+
+
+def _input_spans(pipe: Pipeline) -> list[tuple[int, int]]:
+    index = load_index(pipe.recorder.index_path)
+    return sorted(e["input"] for k, e in index.items() if k != "__session__" and "input" in e)
+
+
+def test_replay_of_recorded_input_reproduces_index():
+    live = _record(SyntheticSpeech(16000, 500, speech_ms=1500, silence_ms=1000, duration_s=12, speed=0))
+    spans = _input_spans(live)
+    assert len(spans) >= 4
+
+    replay = _record(WavStream(live.recorder.input_path, 16000, 500))
+    assert _input_spans(replay) == spans
+    assert sf.info(replay.recorder.input_path).frames == sf.info(live.recorder.input_path).frames
+
+
+def test_lost_blocks_are_padded_and_channels_kept():
+    rec = SessionRecorder(tempfile.mkdtemp(), "s", sr=16000, block_ms=10, max_blocks=16, channels=2)
+    put = rec._q.put_nowait
+    lost = {2, 4}  # второй и последний блоки «не влезли» в очередь
+    n = 0
+
+    def flaky(item):
+        nonlocal n
+        if item[0] == "in":
+            n += 1
+            if n in lost:
+                raise queue.Full
+        if item[0] == "meta" and item[1]["fragment_id"] == "lost":
+            raise queue.Full
+        put(item)
+
+    rec._q.put_nowait = flaky
+    for value in (1, 2, 3, 4):
+        rec.push_input(np.full((160, 2), value, dtype=np.float32))
+    rec.mark_input("f1", 320, 160)
+    rec.mark_input("lost", 0, 160)
+    rec.push_tts("f1", np.ones(100, dtype=np.float32))
+    rec.push_tts("f2", np.ones(50, dtype=np.float32))
+    rec.close()
+
+    data, _ = sf.read(rec.input_path, dtype="float32", always_2d=True)
+    assert data.shape == (640, 2)
+    assert [float(data[i * 160, 0]) for i in range(4)] == [1.0, 0.0, 3.0, 0.0]
+    assert (rec.dropped_input, rec.dropped_index) == (2, 1)
+
+    index = load_index(rec.index_path)
+    assert index["__session__"]["channels"] == 2
+    assert index["f1"] == {"input": (320, 160), "tts": (0, 100)}
+    assert index["f2"]["tts"] == (100, 50)
+    assert "lost" not in index
+    assert os.path.getsize(rec.tts_path) > 0
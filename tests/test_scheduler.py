@@ -0,0 +1,83 @@
+from src.scheduler import FragmentScheduler
+from src.utils import new_fragment
+
+
+class Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _frag(text, mt_dir="ru-en", deadline=None):
+    f = new_fragment(0.0, 1.0, "ru", text, mt_dir)
+    f.deadline = deadline
+    return f
+
+
+def test_expired_fragments_are_skipped():
+    clock = Clock()
+    s = FragmentScheduler(clock=clock)
+    s.put(_frag("старое", deadline=1.0))
+    s.put(_frag("свежее", mt_dir="en-ru", deadline=10.0))
+    clock.t = 5.0
+    assert s.get(timeout=0).asr_text == "свежее"
+    assert s.stats.expired == 1
+
+
+def test_backlog_of_same_direction_is_merged():
+    s = FragmentScheduler(merge_max_words=5)
+    a, b, c = _frag("раз два"), _frag("три четыре"), _frag("пять шесть")
+    for f in (a, b, c):
+        s.put(f)
+    out = s.get(timeout=0)
+    assert out.asr_text == "раз два три четыре"
+    assert out.merged_ids == [b.fragment_id]
+    assert s.stats.merged == 1
+    assert s.get(timeout=0) is c
+
+
+def test_overflow_evicts_oldest():
+    s = FragmentScheduler(maxsize=2, merge_max_words=0)
+    frags = [_frag(f"фраза {i}") for i in range(3)]
+    for f in frags:
+        s.put(f)
+    assert s.stats.dropped == 1
+    assert s.get(timeout=0) is frags[1]
+
+
+def test_discarded_fragments_are_reported():
+    clock = Clock()
+    lost = []
+    s = FragmentScheduler(maxsize=2, merge_max_words=0, clock=clock, on_discard=lost.append)
+    frags = [_frag(f"фраза {i}", deadline=1.0) for i in range(3)]
+    for f in frags:
+        s.put(f)
+    clock.t = 5.0
+    assert s.get(timeout=0) is None
+    assert lost == frags  # вытесненный при put и два истёкших при get
+
+
+def test_fair_queue_round_robins_channels():
+    from src.scheduler import FairQueue
+
+    q = FairQueue()
+    for i in range(3):
+        q.put(0, f"left{i}")
+    q.put(1, "right0")
+    got = [q.get(timeout=0) for _ in range(4)]
+    assert got == [(0, "left0"), (1, "right0"), (0, "left1"), (0, "left2")]
+
+
+def test_fair_queue_evicts_disposable_items_first():
+    from src.scheduler import FairQueue
+
+    q = FairQueue(maxsize_per_key=2)
+    q.put(0, "final0")
+    q.put(0, "partial0", disposable=True)
+    assert q.put(0, "final1") is None            # вытеснен префикс, а не закрытый сегмент
+    assert q.put(0, "partial1", disposable=True) is None  # префикс закрытые не вытесняет
+    assert q.put(0, "final2") == "final0"        # одни закрытые — вытесняется старейший, его возвращают
+    assert q.dropped == 3
+    assert [q.get(timeout=0) for _ in range(2)] == [(0, "final1"), (0, "final2")]
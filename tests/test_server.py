@@ -0,0 +1,100 @@
+import asyncio
+import json
+import tempfile
+import threading
+
+import numpy as np
+import pytest
+
+from src.batching import BatchWorker
+from src.config import Cfg, MockLatencyCfg
+from src.protocol import AUDIO, BYE, END, HELLO, TEXT, WAVE, pack_audio, pack_json, read_frame
+from src.server import TranslationServer
+
+
+def _speech(sr: int) -> np.ndarray:
+    t = np.arange(sr, dtype=np.float32) / sr
+    tone = 0.2 * np.sin(2 * np.pi * 220 * t).astype(np.float32)
+    silence = np.zeros(sr, dtype=np.float32)
+    return np.concatenate([tone, silence, tone, silence])
+
+
+async def _client(port: int, audio: np.ndarray, sr: int):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(pack_json(HELLO, {"sample_rate": sr, "dir": "ru-en"}))
+    block = sr // 10
+    for i in range(0, len(audio), block):
+        writer.write(pack_audio(AUDIO, audio[i:i + block]))
+    writer.write(pack_json(END, {}))
+    await writer.drain()
+    texts, waves = [], 0
+    while True:
+        kind, payload = await read_frame(reader)
+        if kind == TEXT:
+            texts.append(json.loads(payload))
+        elif kind == WAVE:
+            waves += 1
+        elif kind == BYE:
+            writer.close()
+            return texts, waves, json.loads(payload)
+
+
+def _serve(cfg, audio_repeats: int = 1) -> list:
+    srv = TranslationServer(cfg)
+
+    async def run():
+        ready = asyncio.Event()
+        task = asyncio.create_task(srv.serve("127.0.0.1", 0, ready))
+        await ready.wait()
+        audio = np.tile(_speech(srv.sr), audio_repeats)
+        results = await asyncio.gather(*(_client(srv.port, audio, srv.sr) for _ in range(3)))
+        task.cancel()
+        return results
+
+    try:
+        return asyncio.run(run())
+    finally:
+        srv.close()
+
+
+def _cfg() -> Cfg:
+    cfg = Cfg.load("configs/default.yaml")
+    cfg.logging.dir = tempfile.mkdtemp()
+    return cfg
+
+
+def test_mock_server_serves_concurrent_sessions():
+    results = _serve(_cfg())
+
+    for texts, waves, stats in results:
+        assert stats["fragments"] == len(texts) >= 1
+        assert all(t["dir"] == "ru-en" and t["mt_text"] for t in texts)
+        assert waves == sum(1 for t in texts if t["audio_samples"])
+
+
+def test_engine_failure_skips_segment_not_session():
+    cfg = _cfg()
+    cfg.mock.seed = 1
+    cfg.mock.asr = MockLatencyCfg(fail_rate=0.3)
+    cfg.mock.mt = MockLatencyCfg(fail_rate=0.2)
+    results = _serve(cfg, audio_repeats=4)
+
+    assert sum(stats["failed"] for _, _, stats in results) > 0
+    for texts, _, stats in results:  # каждая сессия дошла до BYE
+        assert stats["fragments"] == len(texts) >= 1
+        assert stats["fragments"] + stats["failed"] == stats["segments"]
+
+
+def test_batch_worker_close_fails_pending_requests():
+    started, release = threading.Event(), threading.Event()
+    w = BatchWorker(lambda items: started.set() or release.wait() and items, max_batch=1, max_wait_ms=0)
+    busy = w.submit(1)
+    started.wait(1)
+    queued = w.submit(2)
+    w.close(timeout=0.1)  # поток занят первым запросом
+    with pytest.raises(RuntimeError):
+        queued.result(timeout=1)
+    with pytest.raises(RuntimeError):
+        w.submit(3).result(timeout=1)
+    release.set()
+    assert busy.result(timeout=1) == 1
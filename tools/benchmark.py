@@ -1 +1,152 @@
-print("Placeholder for benchmark script. Implement ASR/MT/TTS latency measurements here.")
+"""
+Задержка перевода: целые сегменты против инкрементального режима (streaming.*).
+
+Прогоняет записанный вход (например, logs/{session}_input.wav при logging.save_input_wav)
+через VAD, ASR и MT обоими способами на модели из конфига. Время считается по шкале
+потока: блок становится доступен в момент своего конца, а ASR/MT выполняются одним
+исполнителем подряд (замеренное время вызова сдвигает «занятость» вперёд). Для каждого
+слова перевода задержка = момент, когда его можно отдать в TTS, − начало речи сегмента.
+
+  python tools/benchmark.py --config configs/cpu_fast.yaml --input logs/session_..._input.wav
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import Cfg  # noqa: E402
+from src.incremental import IncrementalTranslator  # noqa: E402
+from src.models import load_for_config  # noqa: E402
+from src.utils import dir_from_lang, is_meaningful  # noqa: E402
+from src.vad import SimpleEnergyVAD  # noqa: E402
+
+
+class Timeline:
+    """Один исполнитель на шкале потока: задача стартует не раньше готовности входа."""
+
+    def __init__(self):
+        self.busy = 0.0
+
+    def run(self, t_ready: float, fn, *args):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        self.busy = max(self.busy, t_ready) + time.perf_counter() - t0
+        return out
+
+
+def _blocks(audio: np.ndarray, block: int):
+    for i in range(0, len(audio), block):
+        yield i + len(audio[i:i + block]), audio[i:i + block]
+
+
+def _asr(models, cfg, seg):
+    sr = cfg.app.sample_rate
+    lang, text = models.asr.transcribe_segment(
+        seg, sr, language=None if cfg.app.src_lang == "auto" else cfg.app.src_lang)
+    return text, dir_from_lang(lang, cfg.app.dir)
+
+
+def _new_vad(cfg):
+    return SimpleEnergyVAD(threshold=0.0008, min_speech_ms=cfg.vad.min_speech_ms,
+                           min_silence_ms=cfg.vad.min_silence_ms, sr=cfg.app.sample_rate)
+
+
+def run_full(models, cfg, audio):
+    """Текущее поведение: MT после закрытия сегмента, все слова сразу."""
+    sr, vad, tl, lags = cfg.app.sample_rate, _new_vad(cfg), Timeline(), []
+    firsts = []
+    for n_end, block in _blocks(audio, int(sr * cfg.app.chunk_ms / 1000)):
+        seg = vad.push(block)
+        if seg is None:
+            continue
+        t_end, t_onset = n_end / sr, (n_end - len(seg)) / sr
+        text, direction = tl.run(t_end, _asr, models, cfg, seg)
+        if not is_meaningful(text, min_len=3):
+            continue
+        hyp = tl.run(tl.busy, models.mt.translate, text, direction)
+        words = hyp.split()
+        lags += [tl.busy - t_onset] * len(words)
+        if words:
+            firsts.append(tl.busy - t_onset)
+    return lags, firsts
+
+
+def run_incremental(models, cfg, audio):
+    """Префиксы раз в streaming.interval_ms, коммит по wait-k/LCP, хвост — по закрытию сегмента."""
+    sr, vad, tl, lags = cfg.app.sample_rate, _new_vad(cfg), Timeline(), []
+    firsts = []
+    st = cfg.streaming
+    inc = IncrementalTranslator(st.wait_k, st.min_commit_words)
+    step = int(sr * st.interval_ms / 1000)
+    last_partial, first_done = 0, False
+    for n_end, block in _blocks(audio, int(sr * cfg.app.chunk_ms / 1000)):
+        seg = vad.push(block)
+        final = seg is not None
+        if not final:
+            pending = vad.pending_samples()
+            if not pending or pending - last_partial < step:
+                continue
+            last_partial, seg = pending, vad.partial()
+        t_now, t_onset = n_end / sr, (n_end - len(seg)) / sr
+        text, direction = tl.run(t_now, _asr, models, cfg, seg)
+        chunk = ""
+        if is_meaningful(text, min_len=3):
+            chunk = tl.run(tl.busy, inc.step, models.mt, text, direction, n_end, final) or ""
+        elif final:
+            inc.end(n_end)
+        words = chunk.split()
+        lags += [tl.busy - t_onset] * len(words)
+        if words and not first_done:
+            firsts.append(tl.busy - t_onset)
+            first_done = True
+        if final:
+            last_partial, first_done = 0, False
+    return lags, firsts
+
+
+def _summary(name: str, lags: list[float], firsts: list[float]) -> float:
+    avg = float(np.mean(lags)) if lags else float("nan")
+    first = float(np.mean(firsts)) if firsts else float("nan")
+    print(f"{name:12s} слов={len(lags):4d}  средняя задержка слова={avg:6.2f}s  "
+          f"до первого слова={first:6.2f}s")
+    return avg
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Задержка: полные сегменты vs инкрементальный перевод")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--input", required=True, help="записанный вход (WAV, app.sample_rate)")
+    ap.add_argument("--interval-ms", type=int, help="переопределить streaming.interval_ms")
+    ap.add_argument("--wait-k", type=int, help="переопределить streaming.wait_k")
+    args = ap.parse_args()
+
+    cfg = Cfg.load(args.config)
+    if args.interval_ms:
+        cfg.streaming.interval_ms = args.interval_ms
+    if args.wait_k is not None:
+        cfg.streaming.wait_k = args.wait_k
+
+    audio, sr = sf.read(args.input, dtype="float32", always_2d=False)
+    if sr != cfg.app.sample_rate:
+        raise SystemExit(f"{args.input}: ожидается {cfg.app.sample_rate} Hz, получено {sr}")
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+
+    models = load_for_config(cfg)
+    print(f"{args.input}: {len(audio) / sr:.1f}s, interval={cfg.streaming.interval_ms}ms "
+          f"wait_k={cfg.streaming.wait_k}")
+    full = _summary("сегменты", *run_full(models, cfg, audio))
+    inc = _summary("инкремент", *run_incremental(models, cfg, audio))
+    if full == full and inc == inc and full > 0:
+        print(f"снижение средней задержки: {full - inc:.2f}s ({(1 - inc / full) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Генератор нагрузки для локального сервера перевода (python -m src.server).
+
+Открывает N одновременных сессий, в каждой проигрывает WAV (по кругу из списка)
+с заданной скоростью относительно реального времени и собирает ответы.
+Задержка фрагмента = момент получения T − момент отправки последнего сэмпла сегмента (in_end).
+
+Пример:
+  python tools/loadgen.py --sessions 4 --wav D:/audio/ru.wav D:/audio/en.wav --speed 1.0
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.protocol import (  # noqa: E402
+    AUDIO, BYE, END, ERROR, HELLO, TEXT, WAVE,
+    pack_audio, pack_json, read_frame,
+)
+
+
+def load_wav(path: str, sr: int) -> np.ndarray:
+    data, file_sr = sf.read(path, dtype="float32", always_2d=False)
+    if file_sr != sr:
+        raise SystemExit(f"{path}: ожидается {sr} Hz, получено {file_sr}")
+    if data.ndim == 2:
+        data = data.mean(axis=1)
+    return data
+
+
+async def run_session(idx: int, args, audio: np.ndarray) -> dict:
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    writer.write(pack_json(HELLO, {"sample_rate": args.sr, "dir": args.dir, "tts": not args.no_tts}))
+    block = int(args.sr * args.chunk_ms / 1000)
+    sent_at: list[float] = []  # время отправки i-го блока
+    latencies: list[float] = []
+    fragments = 0
+    stats: dict = {}
+
+    async def receive():
+        nonlocal fragments, stats
+        while True:
+            kind, payload = await read_frame(reader)
+            now = time.perf_counter()
+            if kind == TEXT:
+                msg = json.loads(payload)
+                fragments += 1
+                i = max(msg["in_end"] // block - 1, 0)
+                if i < len(sent_at):
+                    latencies.append(now - sent_at[i])
+            elif kind == WAVE:
+                pass
+            elif kind in (BYE, ERROR):
+                stats = json.loads(payload)
+                return
+
+    rx = asyncio.create_task(receive())
+    t0 = time.perf_counter()
+    for n, i in enumerate(range(0, len(audio), block)):
+        # темп: speed=1 — реальное время, 0 — так быстро, как примет сокет
+        if args.speed > 0:
+            delay = t0 + n * args.chunk_ms / 1000 / args.speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        writer.write(pack_audio(AUDIO, audio[i:i + block]))
+        await writer.drain()
+        sent_at.append(time.perf_counter())
+    writer.write(pack_json(END, {}))
+    await writer.drain()
+    await rx
+    writer.close()
+    return {"session": idx, "fragments": fragments, "latencies": latencies,
+            "audio_s": len(audio) / args.sr, "server": stats}
+
+
+async def main_async(args):
+    wavs = [load_wav(p, args.sr) for p in args.wav]
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(run_session(i, args, wavs[i % len(wavs)]) for i in range(args.sessions)))
+    wall = time.perf_counter() - t0
+
+    lat = np.array([x for r in results for x in r["latencies"]] or [float("nan")])
+    audio_s = sum(r["audio_s"] for r in results)
+    frags = sum(r["fragments"] for r in results)
+    print(f"sessions={args.sessions} wall={wall:.2f}s audio={audio_s:.1f}s "
+          f"rtf_total={audio_s / wall:.2f}x fragments={frags} ({frags / wall:.2f}/s)")
+    print(f"latency p50={np.nanpercentile(lat, 50):.3f}s p95={np.nanpercentile(lat, 95):.3f}s "
+          f"max={np.nanmax(lat):.3f}s")
+    for r in results:
+        print(f"  s{r['session']}: fragments={r['fragments']} server={r['server']}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Нагрузочный клиент сервера перевода")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--sessions", type=int, default=4)
+    ap.add_argument("--wav", nargs="+", required=True)
+    ap.add_argument("--sr", type=int, default=16000)
+    ap.add_argument("--chunk-ms", type=int, default=500)
+    ap.add_argument("--speed", type=float, default=1.0, help="1 — реальное время, 0 — без пауз")
+    ap.add_argument("--dir", default="auto", choices=["auto", "ru-en", "en-ru"])
+    ap.add_argument("--no-tts", action="store_true")
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Нагрузочный прогон конвейера без моделей: mock-движки с задержками (секция mock:)
+и синтетический вход «речь/тишина», поданный быстрее или медленнее реального времени.
+
+Для каждой скорости подачи — отдельный прогон Pipeline (AsyncPipeline + воспроизведение
+через MockPlayer); печатается CSV для графиков пропускной способности и задержки:
+задержка = момент передачи фрагмента на воспроизведение − конец захвата сегмента.
+
+  python tools/stress.py --config configs/default.yaml --speeds 0.5 1 2 4 8 \\
+      --asr-ms 400 --mt-ms 150 --mt-dist longtail --duration 60 > curves.csv
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.aio import AsyncPipeline, iterate_in_thread, play_fragments  # noqa: E402
+from src.config import Cfg  # noqa: E402
+from src.mock import SyntheticSpeech  # noqa: E402
+from src.pipeline import Pipeline  # noqa: E402
+
+COLUMNS = ("speed", "audio_s", "wall_s", "fragments", "frag_per_s", "lag_mean_s", "lag_p95_s",
+           "expired", "merged", "dropped", "segments_dropped", "failed")
+
+
+def run_once(cfg, speed: float, duration_s: float, speech_ms: int, silence_ms: int) -> dict:
+    src = SyntheticSpeech(cfg.app.sample_rate, cfg.app.chunk_ms, speech_ms, silence_ms, duration_s, speed)
+    pipe = Pipeline(cfg, src)
+    pipe.player.speed = speed
+    pipe.wait_ready()
+    lags: list[float] = []
+
+    async def tap(frags):
+        async for frag in frags:
+            lags.append(time.perf_counter() - frag.t_capture)
+            yield frag
+
+    async def main():
+        blocks = iterate_in_thread(src.stream(), stop=pipe.stop, stamp=True)
+        # синтетика изображает микрофон: дедлайны и вытеснение как вживую
+        await play_fragments(tap(AsyncPipeline(pipe, live=True).fragments(blocks)), pipe)
+
+    t0 = time.perf_counter()
+    try:
+        asyncio.run(main())
+    finally:
+        wall = time.perf_counter() - t0
+        pipe.close()
+    lat = np.array(lags or [float("nan")])
+    return {
+        "speed": speed,
+        "audio_s": duration_s,
+        "wall_s": round(wall, 2),
+        "fragments": len(lags),
+        "frag_per_s": round(len(lags) / wall, 3),
+        "lag_mean_s": round(float(np.nanmean(lat)), 3) if lags else "",
+        "lag_p95_s": round(float(np.nanpercentile(lat, 95)), 3) if lags else "",
+        **{k: v for k, v in pipe.stats().items() if k in COLUMNS},
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Кривые пропускной способности/задержки на mock-движках")
+    ap.add_argument("--config", required=True)
+    ap.add_argument("--speeds", type=float, nargs="+", default=[0.5, 1, 2, 4])
+    ap.add_argument("--duration", type=float, default=30.0, help="секунд синтетического входа")
+    ap.add_argument("--speech-ms", type=int, default=3000)
+    ap.add_argument("--silence-ms", type=int, default=1000)
+    for stage in ("asr", "mt", "tts"):
+        ap.add_argument(f"--{stage}-ms", type=float, help=f"mock.{stage}.ms")
+        ap.add_argument(f"--{stage}-dist", choices=["fixed", "normal", "longtail"], help=f"mock.{stage}.dist")
+        ap.add_argument(f"--{stage}-fail", type=float, help=f"mock.{stage}.fail_rate")
+    args = ap.parse_args()
+
+    cfg = Cfg.load(args.config)
+    cfg.app.mock = True
+    cfg.app.mode = "wav"  # эхо-гейт не нужен: динамика нет
+    cfg.mock.playback = "sleep"
+    cfg.logging.dir = tempfile.mkdtemp(prefix="stress_")
+    for stage in ("asr", "mt", "tts"):
+        spec = getattr(cfg.mock, stage)
+        for opt, field in (("ms", "ms"), ("dist", "dist"), ("fail", "fail_rate")):
+            value = getattr(args, f"{stage}_{opt}")
+            if value is not None:
+                setattr(spec, field, value)
+
+    print(",".join(COLUMNS))
+    for speed in args.speeds:
+        row = run_once(cfg, speed, args.duration, args.speech_ms, args.silence_ms)
+        print(",".join(str(row.get(c, "")) for c in COLUMNS), flush=True)
+
+
+if __name__ == "__main__":
+    main()